@@ -0,0 +1,77 @@
+"""
+Decision Cache - persists parsed agent decisions across processes (SQLite)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+DECISION_CACHE_DB_PATH = os.getenv("HOMENET_DECISION_CACHE_PATH", ".homenet_decisions.db")
+DECISION_CACHE_TTL_SECONDS = 3600
+
+
+def decision_key(building_id: str, current_demand: int, predicted_demand: int, peak_hour: str) -> str:
+    """Canonical cache key for a (building, bucketed metrics, peak hour) decision."""
+    raw = f"{building_id}|{current_demand}|{predicted_demand}|{peak_hour}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+# One connection per thread (sqlite3 connections are not shared across threads)
+_local = threading.local()
+
+
+def _connection() -> sqlite3.Connection:
+    """This thread's connection to DECISION_CACHE_DB_PATH; the schema is created when it opens."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == DECISION_CACHE_DB_PATH:
+        return conn
+    # First call on this thread, or the path changed (e.g. tests)
+    _reset_connection()
+    conn = sqlite3.connect(DECISION_CACHE_DB_PATH, timeout=5)
+    try:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS decisions ("
+            "key TEXT PRIMARY KEY, stored_at REAL NOT NULL, decision TEXT NOT NULL)"
+        )
+    except sqlite3.Error:
+        conn.close()
+        raise
+    _local.conn, _local.path = conn, DECISION_CACHE_DB_PATH
+    return conn
+
+
+def _reset_connection() -> None:
+    """Drop this thread's connection after an error; the next call reconnects."""
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None:
+        conn.close()
+
+
+def get_decision(key: str) -> Optional[dict]:
+    """Return the cached decision for `key` if it is younger than the TTL."""
+    try:
+        row = _connection().execute(
+            "SELECT stored_at, decision FROM decisions WHERE key = ?", (key,)
+        ).fetchone()
+    except sqlite3.Error:
+        _reset_connection()
+        return None
+    if row is None or time.time() - row[0] >= DECISION_CACHE_TTL_SECONDS:
+        return None
+    return json.loads(row[1])
+
+
+def put_decision(key: str, decision: dict) -> None:
+    """Store a decision; cache write failures never break the agent run."""
+    try:
+        with _connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO decisions (key, stored_at, decision) VALUES (?, ?, ?)",
+                (key, time.time(), json.dumps(decision)),
+            )
+    except sqlite3.Error:
+        _reset_connection()
@@ -2,22 +2,234 @@
 Forecast Agent - LLM-powered demand forecasting analysis with LangGraph
 INTEGRATED WITH AMOGH'S ML MODEL
 """
+import asyncio
+import logging
 import sys
 import os
+import time
 from datetime import datetime, timedelta
+from typing import List, Literal, Optional
 
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, parent_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
 
-from agents.state import AgentState
-from agents.llm_config import get_llm
+from models.demand_forecast.predict import forecast_water_demand
+from agents.state import AgentState, build_agent_state
+from agents.llm_config import ainvoke_with_cascade, run_async
+from agents.decision_cache import decision_key, get_decision, put_decision
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from pydantic import BaseModel, Field
 
+logger = logging.getLogger(__name__)
 
-def forecast_agent_node(state: AgentState) -> dict:
+
+FORECAST_SYSTEM_PROMPT = "You are a water capacity planning AI."
+
+# Invariant system message, built once and shared by every call.
+_FORECAST_SYSTEM_MSG = SystemMessage(content=FORECAST_SYSTEM_PROMPT)
+
+FORECAST_STATIC_RULES = """Peak % of hourly capacity: 95+ critical, immediate | 85-94 high, prepare backup | 70-84 medium, enhanced monitoring | <70 normal
+action_required: true/false
+action_type: capacity_alert | capacity_monitoring | enhanced_monitoring | none
+priority: CRITICAL | HIGH | MEDIUM | LOW
+sla_hours: 2 | 6 | 12 | null
+reasoning: max 2 sentences
+"""
+
+FORECAST_RESPONSE_FORMAT = """Reply ONLY JSON: {"action_required": true, "action_type": "...", "priority": "...", "sla_hours": 6, "reasoning": "..."}
+"""
+
+# Per-building data lines (values are pre-bucketed by the caller).
+FORECAST_BUILDING_TEMPLATE = """building: {building_id}
+total_24h_l: {forecast_total}
+demand_level: {demand_level}
+peak_hour: {peak_hour}
+peak_l: {peak_value}
+avg_pct: {current_demand}
+peak_pct: {predicted_demand}
+ml_recommendation: {recommendation}"""
+
+# Static prompt prefix, built once at import.
+FORECAST_PROMPT_PREFIX = FORECAST_STATIC_RULES + FORECAST_RESPONSE_FORMAT
+
+
+class ForecastDecision(BaseModel):
+    """Structured capacity decision returned by the LLM (JSON mode)."""
+    action_required: bool
+    action_type: Literal["capacity_alert", "capacity_monitoring", "enhanced_monitoring", "none"]
+    priority: Literal["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+    sla_hours: Optional[int] = None
+    reasoning: str = Field(min_length=1)
+
+
+def _has_reasoning(decision) -> bool:
+    """False for whitespace-only reasoning, which min_length alone lets through."""
+    return bool(decision.reasoning.strip())
+
+
+class ForecastBatchDecision(ForecastDecision):
+    building_id: str
+
+
+class ForecastBatchReply(BaseModel):
+    decisions: List[ForecastBatchDecision]
+
+
+# ML forecast memo: (building_id, horizon_hours) -> (stored_at, forecast).
+# Forecasts are hourly, so reusing one for 15 minutes is safe.
+FORECAST_CACHE_TTL_SECONDS = 900
+FORECAST_CACHE_MAX_SIZE = 128
+_forecast_cache = {}
+
+
+def _cached_forecast(building_id: str, horizon_hours: int = 24, force_refresh: bool = False) -> dict:
+    """Return forecast_water_demand() output, reusing a fresh cached result when possible."""
+    key = (building_id, horizon_hours)
+    now = time.monotonic()
+    hit = _forecast_cache.get(key)
+    if hit and not force_refresh and now - hit[0] < FORECAST_CACHE_TTL_SECONDS:
+        return hit[1]
+
+    ml_forecast = forecast_water_demand(asset_id=building_id, horizon_hours=horizon_hours)
+    if len(_forecast_cache) >= FORECAST_CACHE_MAX_SIZE:
+        _forecast_cache.pop(next(iter(_forecast_cache)))
+    _forecast_cache[key] = (now, ml_forecast)
+    return ml_forecast
+
+
+def _bucket(x: float, step: float) -> int:
+    """Snap a prompt value to a coarse bucket so near-identical runs share a cache key."""
+    return int(round(x / step) * step)
+
+
+# Capacity bands that map to one decision; predicted demand inside the
+# uncertainty band (or 70-84%) still goes to the LLM for judgement.
+RULE_UNCERTAINTY_BAND = (82, 88)
+
+
+def _rule_decide(current_demand: float, predicted_demand: float) -> dict | None:
+    """Deterministic decision for unambiguous predicted-demand bands, else None."""
+    low, high = RULE_UNCERTAINTY_BAND
+    if predicted_demand >= 95:
+        band = "95%+ critical"
+        decision = {"action_required": True, "action_type": "capacity_alert", "priority": "CRITICAL", "sla_hours": 2}
+    elif 85 <= predicted_demand < 95 and not (low <= predicted_demand <= high):
+        band = "85-94% high"
+        decision = {"action_required": True, "action_type": "capacity_monitoring", "priority": "HIGH", "sla_hours": 6}
+    elif predicted_demand < 70:
+        band = "<70% normal"
+        decision = {"action_required": False, "action_type": "none", "priority": "LOW", "sla_hours": None}
+    else:
+        return None
+
+    decision["reasoning"] = f"Rule: predicted={predicted_demand}% (current={current_demand}%) in band {band}."
+    return decision
+
+
+def _decision_cache_key(building_id: str, current_demand: float, predicted_demand: float, peak_time: datetime) -> str:
+    """Persistent decision-cache key, bucketed like the LLM prompt."""
+    return decision_key(
+        building_id,
+        _bucket(current_demand, 5),
+        _bucket(predicted_demand, 5),
+        peak_time.strftime('%Y-%m-%d %H:00'),
+    )
+
+
+def _format_building(*, building_id, forecast_total, demand_level, peak_time,
+                     peak_value, current_demand, predicted_demand, recommendation, **_) -> str:
+    """Fill FORECAST_BUILDING_TEMPLATE with bucketed values."""
+    return FORECAST_BUILDING_TEMPLATE.format(
+        building_id=building_id,
+        forecast_total=_bucket(forecast_total, 10),
+        demand_level=demand_level,
+        peak_hour=peak_time.strftime('%Y-%m-%d %H:00'),
+        peak_value=_bucket(peak_value, 10),
+        current_demand=_bucket(current_demand, 5),
+        predicted_demand=_bucket(predicted_demand, 5),
+        recommendation=recommendation,
+    )
+
+
+async def _llm_decide(
+    *,
+    building_id: str,
+    forecast_total: float,
+    demand_level: str,
+    peak_time: datetime,
+    peak_value: float,
+    current_demand: float,
+    predicted_demand: float,
+    recommendation: str,
+) -> dict:
+    """Ask the LLM for a capacity decision on borderline forecasts."""
+    # Prompt values are bucketed (liters -> 10, % -> 5, time -> hour) so repeated
+    # runs hit the LLM cache; the node's state updates keep the precise numbers.
+    # Static instructions go first so providers can reuse the cached prefix.
+    prompt = FORECAST_PROMPT_PREFIX + _format_building(
+        building_id=building_id,
+        forecast_total=forecast_total,
+        demand_level=demand_level,
+        peak_time=peak_time,
+        peak_value=peak_value,
+        current_demand=current_demand,
+        predicted_demand=predicted_demand,
+        recommendation=recommendation,
+    ) + "\n"
+    
+    # Cheap model first; escalate to the 70B model only if its JSON fails validation.
+    decision = await ainvoke_with_cascade(
+        [
+            _FORECAST_SYSTEM_MSG,
+            HumanMessage(content=prompt)
+        ],
+        ForecastDecision,
+        is_valid=_has_reasoning,
+    )
+    
+    return decision.model_dump()
+
+
+def _forecast_metrics(ml_forecast: dict) -> dict:
+    """Derive the capacity metrics the decision step works from."""
+    # Extract ML predictions
+    forecast_total = ml_forecast.get("forecast_total", 0)
+    demand_level = ml_forecast.get("demand_level", "UNKNOWN")  # HIGH/MEDIUM/LOW
+    peak_hour = ml_forecast.get("peak_hour", {})
+    peak_value = peak_hour.get("value", 0) if peak_hour else 0
+    peak_time_str = peak_hour.get("timestamp", "N/A") if peak_hour else "N/A"
+    recommendation = ml_forecast.get("recommendation", "No recommendation")
+    
+    # Calculate capacity percentages (adjust MAX_CAPACITY based on your system)
+    MAX_CAPACITY_PER_HOUR = 500  # liters per hour (adjust to your tank capacity)
+    current_demand = min(100, int((forecast_total / 24) / MAX_CAPACITY_PER_HOUR * 100))
+    predicted_demand = min(100, int(peak_value / MAX_CAPACITY_PER_HOUR * 100))
+    
+    # Parse peak time (fallback: two hours from now, computed once)
+    fallback_peak = datetime.now() + timedelta(hours=2)
+    try:
+        peak_time = datetime.fromisoformat(peak_time_str) if peak_time_str != "N/A" else fallback_peak
+    except:
+        peak_time = fallback_peak
+    
+    return {
+        "forecast_total": forecast_total,
+        "demand_level": demand_level,
+        "peak_value": peak_value,
+        "peak_time": peak_time,
+        "recommendation": recommendation,
+        "current_demand": current_demand,
+        "predicted_demand": predicted_demand,
+    }
+
+
+async def forecast_agent_node(state: AgentState, decision: dict | None = None) -> dict:
     """
     LLM-powered Forecast Agent with REAL ML predictions
     Analyzes demand forecasts and makes capacity decisions
+    
+    `decision` lets batch runs pass in a decision that was already made.
     """
     building_id = state.get("building_id")
     
@@ -30,30 +242,23 @@ def forecast_agent_node(state: AgentState) -> dict:
     }
     
     try:
-        # ✅ IMPORT AND USE AMOGH'S REAL ML MODEL
-        from models.demand_forecast.predict import forecast_water_demand
+        # Get real ML forecast (memoized per building for FORECAST_CACHE_TTL_SECONDS);
+        # runs in a worker thread so other nodes' LLM calls keep progressing.
+        ml_forecast = await asyncio.to_thread(
+            _cached_forecast,
+            building_id,
+            horizon_hours=24,
+            force_refresh=bool(state.get("force_refresh")),
+        )
         
-        # Get real ML forecast
-        ml_forecast = forecast_water_demand(asset_id=building_id, horizon_hours=24)
-        
-        # Extract ML predictions
-        forecast_total = ml_forecast.get("forecast_total", 0)
-        demand_level = ml_forecast.get("demand_level", "UNKNOWN")  # HIGH/MEDIUM/LOW
-        peak_hour = ml_forecast.get("peak_hour", {})
-        peak_value = peak_hour.get("value", 0) if peak_hour else 0
-        peak_time_str = peak_hour.get("timestamp", "N/A") if peak_hour else "N/A"
-        recommendation = ml_forecast.get("recommendation", "No recommendation")
-        
-        # Calculate capacity percentages (adjust MAX_CAPACITY based on your system)
-        MAX_CAPACITY_PER_HOUR = 500  # liters per hour (adjust to your tank capacity)
-        current_demand = min(100, int((forecast_total / 24) / MAX_CAPACITY_PER_HOUR * 100))
-        predicted_demand = min(100, int(peak_value / MAX_CAPACITY_PER_HOUR * 100))
-        
-        # Parse peak time
-        try:
-            peak_time = datetime.fromisoformat(peak_time_str) if peak_time_str != "N/A" else datetime.now() + timedelta(hours=2)
-        except:
-            peak_time = datetime.now() + timedelta(hours=2)
+        metrics = _forecast_metrics(ml_forecast)
+        forecast_total = metrics["forecast_total"]
+        demand_level = metrics["demand_level"]
+        peak_value = metrics["peak_value"]
+        peak_time = metrics["peak_time"]
+        recommendation = metrics["recommendation"]
+        current_demand = metrics["current_demand"]
+        predicted_demand = metrics["predicted_demand"]
         
         updates.update({
             "current_demand": current_demand,
@@ -65,80 +270,39 @@ def forecast_agent_node(state: AgentState) -> dict:
             "ml_forecast_raw": ml_forecast,
         })
         
-        # Use LLM for intelligent reasoning based on REAL ML data
-        llm = get_llm()
-        
-        prompt = f"""You are an AI demand forecasting agent analyzing water demand capacity.
-
-BUILDING: {building_id}
-
-ML FORECAST RESULTS:
-- Total 24h Demand: {forecast_total:.2f} liters
-- Demand Level: {demand_level}
-- Peak Hour: {peak_time.strftime('%Y-%m-%d %H:%M')}
-- Peak Value: {peak_value:.2f} liters
-- Current Avg Demand: {current_demand}% of hourly capacity
-- Predicted Peak Demand: {predicted_demand}% of hourly capacity
-- ML Recommendation: {recommendation}
-
-CAPACITY THRESHOLDS:
-- 95%+ : Critical - immediate action required
-- 85-94% : High - prepare backup systems
-- 70-84% : Medium - enhanced monitoring
-- <70% : Normal - standard monitoring
-
-Based on this REAL ML forecast data, decide:
-1. ACTION_REQUIRED: true/false
-2. ACTION_TYPE: capacity_alert | capacity_monitoring | enhanced_monitoring | none
-3. PRIORITY: CRITICAL | HIGH | MEDIUM | LOW
-4. SLA_HOURS: 2 | 6 | 12 | null
-5. REASONING: Brief explanation (max 2 sentences)
-
-Respond in this exact format:
-ACTION_REQUIRED: [true/false]
-ACTION_TYPE: [type]
-PRIORITY: [priority]
-SLA_HOURS: [hours]
-REASONING: [your reasoning]
-"""
-        
-        response = llm.invoke([
-            SystemMessage(content="You are an expert facility management AI assistant specializing in demand forecasting and capacity planning."),
-            HumanMessage(content=prompt)
-        ])
-        
-        # Parse LLM response
-        lines = response.content.strip().split('\n')
-        llm_decision = {}
-        for line in lines:
-            if ':' in line:
-                key, value = line.split(':', 1)
-                llm_decision[key.strip()] = value.strip()
+        # Unambiguous capacity bands are decided by rule; only borderline cases
+        # pay for an LLM call.
+        if decision is None:
+            decision = _rule_decide(current_demand, predicted_demand)
+        if decision is None:
+            # Reruns (new processes included) reuse a decision for up to an hour.
+            cache_key = _decision_cache_key(building_id, current_demand, predicted_demand, peak_time)
+            decision = get_decision(cache_key)
+            if decision is None:
+                decision = await _llm_decide(
+                    building_id=building_id,
+                    forecast_total=forecast_total,
+                    demand_level=demand_level,
+                    peak_time=peak_time,
+                    peak_value=peak_value,
+                    current_demand=current_demand,
+                    predicted_demand=predicted_demand,
+                    recommendation=recommendation,
+                )
+                put_decision(cache_key, decision)
         
-        # Apply LLM decision
-        action_required = llm_decision.get("ACTION_REQUIRED", "false").lower() == "true"
-        action_type = llm_decision.get("ACTION_TYPE", "none")
-        priority = llm_decision.get("PRIORITY", "LOW")
-        reasoning = llm_decision.get("REASONING", "No reasoning provided")
+        action_required = decision["action_required"]
+        action_type = decision["action_type"]
+        priority = decision["priority"]
+        sla_hours = decision["sla_hours"]
+        reasoning = decision["reasoning"]
         
-        try:
-            sla = llm_decision.get("SLA_HOURS", "null")
-            sla_hours = int(sla) if sla != "null" else None
-        except:
-            sla_hours = None
-        
-        updates.update({
-            "action_required": action_required,
-            "action_type": action_type,
-            "priority": priority,
-            "sla_hours": sla_hours,
-            "reasoning": reasoning,
-        })
+        updates.update(decision)
         
         # Create task if needed (check for duplicates)
         if action_required:
             task_id = f"TASK_FORECAST_{building_id}"
-            existing = any(t.get("task_id") == task_id for t in state.get("tasks", []))
+            existing = task_id in state.get("task_ids", set())
             
             if not existing:
                 task = {
@@ -151,6 +315,7 @@ REASONING: [your reasoning]
                     "asset_id": building_id
                 }
                 updates["tasks"] = state.get("tasks", []) + [task]
+                updates["task_ids"] = state.get("task_ids", set()) | {task_id}
                 updates["task_title"] = task["title"]
                 updates["task_description"] = task["description"]
                 updates["messages"] = updates["messages"] + [AIMessage(content=f"⚠️ {priority}: {building_id} capacity alert ({demand_level})")]
@@ -178,17 +343,22 @@ REASONING: [your reasoning]
     return updates
 
 
-def run_forecast_agent(building_id: str) -> dict:
+def run_forecast_agent(building_id: str, decision: dict | None = None) -> dict:
     """
     Standalone function to run forecast agent for a building
     """
-    from agents.state import build_agent_state
-    
+    return run_async(arun_forecast_agent(building_id, decision=decision))
+
+
+async def arun_forecast_agent(building_id: str, decision: dict | None = None) -> dict:
+    """
+    Async run_forecast_agent() for callers already on an event loop
+    """
     # Initialize state
     state = build_agent_state(site_id="SITE_001", building_id=building_id)
     
     # Run agent
-    result = forecast_agent_node(state)
+    result = await forecast_agent_node(state, decision=decision)
     
     # Manual merge for standalone output
     merged = dict(state)
@@ -217,6 +387,105 @@ def run_forecast_agent(building_id: str) -> dict:
     }
 
 
+FORECAST_BATCH_RESPONSE_FORMAT = """Reply ONLY JSON, one decision per numbered building: {"decisions": [{"building_id": "...", "action_required": true, "action_type": "...", "priority": "...", "sla_hours": 6, "reasoning": "..."}]}
+"""
+
+FORECAST_BATCH_PROMPT_PREFIX = FORECAST_STATIC_RULES + FORECAST_BATCH_RESPONSE_FORMAT
+
+# Fewest borderline buildings worth one batched prompt; a lone building
+# takes its usual single-decision call instead.
+MIN_LLM_BATCH_SIZE = 2
+
+
+async def _llm_decide_batch(items: list[dict]) -> dict:
+    """
+    Decide several borderline buildings with ONE LLM call.
+
+    `items` are {"building_id": ..., **_forecast_metrics(...)}; returns
+    building_id -> decision for every building the LLM answered validly.
+    """
+    blocks = [f"{idx}. {_format_building(**m)}" for idx, m in enumerate(items, 1)]
+    prompt = FORECAST_BATCH_PROMPT_PREFIX + "\n\n".join(blocks) + "\n"
+
+    wanted = {m["building_id"] for m in items}
+
+    reply = await ainvoke_with_cascade(
+        [
+            _FORECAST_SYSTEM_MSG,
+            HumanMessage(content=prompt)
+        ],
+        ForecastBatchReply,
+        is_valid=lambda r: (
+            wanted <= {d.building_id for d in r.decisions}
+            and all(_has_reasoning(d) for d in r.decisions)
+        ),
+    )
+
+    return {
+        d.building_id: d.model_dump(exclude={"building_id"})
+        for d in reply.decisions
+        if d.building_id in wanted
+    }
+
+
+def run_forecast_agent_batch(building_ids: list[str]) -> list[dict]:
+    """
+    Run the forecast agent for several buildings, packing every borderline
+    (non rule-decided) building into a single LLM call once there are at
+    least MIN_LLM_BATCH_SIZE of them.
+
+    Returns one run_forecast_agent()-shaped result per building, in order.
+    """
+    return run_async(arun_forecast_agent_batch(building_ids))
+
+
+async def arun_forecast_agent_batch(building_ids: list[str]) -> list[dict]:
+    """Async run_forecast_agent_batch(); per-building runs proceed concurrently."""
+    decisions = {}
+    borderline = []
+    # Prophet runs in worker threads (together) so the shared loop keeps serving
+    forecasts = await asyncio.gather(
+        *(asyncio.to_thread(_cached_forecast, b, horizon_hours=24) for b in building_ids),
+        return_exceptions=True,
+    )
+    for building_id, ml_forecast in zip(building_ids, forecasts):
+        try:
+            if isinstance(ml_forecast, BaseException):
+                raise ml_forecast
+            metrics = _forecast_metrics(ml_forecast)
+        except Exception:
+            # Per-building node run below reports the error.
+            continue
+        rule = _rule_decide(metrics["current_demand"], metrics["predicted_demand"])
+        if rule is None:
+            rule = get_decision(_decision_cache_key(
+                building_id, metrics["current_demand"], metrics["predicted_demand"], metrics["peak_time"]
+            ))
+        if rule is None:
+            borderline.append({"building_id": building_id, **metrics})
+        else:
+            decisions[building_id] = rule
+
+    if len(borderline) >= MIN_LLM_BATCH_SIZE:
+        try:
+            batch = await _llm_decide_batch(borderline)
+            for m in borderline:
+                if m["building_id"] in batch:
+                    put_decision(
+                        _decision_cache_key(m["building_id"], m["current_demand"], m["predicted_demand"], m["peak_time"]),
+                        batch[m["building_id"]],
+                    )
+            decisions.update(batch)
+        except Exception as exc:
+            # Buildings without a batch decision fall back to one call each.
+            logger.warning("Batched forecast decision failed for %d buildings (%s); deciding each separately",
+                           len(borderline), exc)
+
+    return list(await asyncio.gather(
+        *(arun_forecast_agent(b, decision=decisions.get(b)) for b in building_ids)
+    ))
+
+
 if __name__ == "__main__":
     """Test the forecast agent with REAL ML"""
     print("="*70)
@@ -225,13 +494,12 @@ if __name__ == "__main__":
     
     buildings = ["BLD_001", "BLD_002"]
     
-    for building_id in buildings:
+    # One batched LLM call covers every borderline building.
+    for building_id, result in zip(buildings, run_forecast_agent_batch(buildings)):
         print(f"\n{'='*70}")
         print(f"Testing: {building_id}")
         print('='*70)
         
-        result = run_forecast_agent(building_id)
-        
         print(f"🔮 ML Forecast Total: {result.get('forecast_total', 'N/A')} liters/24h")
         print(f"📊 Demand Level: {result.get('demand_level', 'N/A')}")
         print(f"📈 Current Avg Demand: {result['current_demand']}%")
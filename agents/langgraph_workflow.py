@@ -3,14 +3,17 @@ LangGraph Multi-Agent Workflow - Clean message handling
 """
 import sys
 import os
+from functools import lru_cache
 from typing import Literal
 
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, parent_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
 
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import AIMessage
 from agents.state import AgentState, build_agent_state
+from agents.llm_config import run_async
 from agents.maintenance_agent import maintenance_agent_node
 from agents.routing_agent import routing_agent_node
 
@@ -44,7 +47,9 @@ def route_agent(state: AgentState) -> Literal["maintenance", "routing", "end"]:
     return "end"
 
 
+@lru_cache(maxsize=1)
 def build_workflow():
+    """Compile the agent graph (memoized: nodes and edges never change at runtime)."""
     workflow = StateGraph(AgentState)
     workflow.add_node("supervisor", supervisor_node)
     workflow.add_node("maintenance", maintenance_agent_node)
@@ -64,10 +69,17 @@ def build_workflow():
     return workflow.compile()
 
 
+# Compiled once at import and shared by every run.
+_APP = build_workflow()
+
+
 def run_langgraph_workflow(pump_id: str, tank_pct: float = 50.0):
-    app = build_workflow()
+    return run_async(arun_langgraph_workflow(pump_id, tank_pct=tank_pct))
+
+
+async def arun_langgraph_workflow(pump_id: str, tank_pct: float = 50.0):
     initial_state = build_agent_state(site_id="SITE_001", pump_id=pump_id, tank_pct=tank_pct)
-    return app.invoke(initial_state)
+    return await _APP.ainvoke(initial_state)
 
 
 if __name__ == "__main__":
@@ -1,14 +1,161 @@
 """
 LLM Configuration for LangGraph Agents - OpenRouter
 """
+import asyncio
+import hashlib
+import logging
 import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Optional, Type
+
 from dotenv import load_dotenv
+from pydantic import BaseModel, ValidationError
 from langchain_openai import ChatOpenAI
+from langchain_core.globals import set_llm_cache
+from langchain_core.caches import BaseCache, InMemoryCache
+from langchain_core.runnables import RunnableLambda
 
 # Load environment variables
 load_dotenv()
 
-def get_llm(model="meta-llama/llama-3.1-70b-instruct", temperature=0):
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_DB_PATH = os.getenv("HOMENET_LLM_CACHE_PATH", ".homenet_llm.db")
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("HOMENET_SEMANTIC_CACHE_THRESHOLD", "0.85"))
+
+LLM_MEMORY_CACHE_MAX_SIZE = 1024
+
+# Global LLM cache hit/miss counters (exposed on the API's /metrics route).
+LLM_CACHE_STATS = {"hits": 0, "misses": 0}
+
+_llm_cache_configured = False
+
+# Whitespace runs, including JSON-escaped newlines in serialized chat prompts.
+_WHITESPACE_RE = re.compile(r"(?:\s|\\n|\\t)+")
+
+
+class BoundedInMemoryCache(InMemoryCache):
+    """InMemoryCache that drops its oldest entry once `maxsize` is reached."""
+
+    def __init__(self, maxsize: int = LLM_MEMORY_CACHE_MAX_SIZE) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        if len(self._cache) >= self.maxsize and (prompt, llm_string) not in self._cache:
+            self._cache.pop(next(iter(self._cache)))
+        super().update(prompt, llm_string, return_val)
+
+
+class NormalizingCache(BaseCache):
+    """
+    Wraps another LangChain cache: collapses whitespace in the prompt key so
+    formatting-only differences still hit, and counts hits/misses.
+    """
+
+    def __init__(self, inner: BaseCache) -> None:
+        self.inner = inner
+
+    @staticmethod
+    def _normalize(prompt: str) -> str:
+        return _WHITESPACE_RE.sub(" ", prompt).strip()
+
+    def _count(self, value):
+        LLM_CACHE_STATS["hits" if value is not None else "misses"] += 1
+        return value
+
+    def lookup(self, prompt: str, llm_string: str):
+        return self._count(self.inner.lookup(self._normalize(prompt), llm_string))
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        self.inner.update(self._normalize(prompt), llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.inner.clear(**kwargs)
+
+    async def alookup(self, prompt: str, llm_string: str):
+        return self._count(await self.inner.alookup(self._normalize(prompt), llm_string))
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val) -> None:
+        await self.inner.aupdate(self._normalize(prompt), llm_string, return_val)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        await self.inner.aclear(**kwargs)
+
+
+def _init_gptcache(cache_obj, llm: str) -> None:
+    """GPTCache init hook: one similarity cache directory per model config."""
+    from gptcache.adapter.api import init_similar_cache
+    from gptcache.config import Config
+
+    llm_hash = hashlib.sha256(llm.encode()).hexdigest()
+    init_similar_cache(
+        cache_obj=cache_obj,
+        data_dir=f"gptcache_{llm_hash}",
+        config=Config(similarity_threshold=SEMANTIC_CACHE_THRESHOLD),
+    )
+
+
+def configure_llm_cache() -> None:
+    """
+    Install LangChain's global LLM cache (runs once per process).
+
+    HOMENET_CACHE=memory (default) keeps responses in-process,
+    HOMENET_CACHE=sqlite persists them to LLM_CACHE_DB_PATH, HOMENET_CACHE=off
+    disables it. sqlite needs langchain-community, which is not in
+    requirements.txt, hence the in-memory default. Identical prompts
+    then return from the cache instead of calling OpenRouter.
+
+    HOMENET_CACHE=semantic uses GPTCache (pip install gptcache) so prompts that
+    only differ by small numeric jitter still hit a cached decision.
+
+    Exact-match caches are wrapped in NormalizingCache (whitespace-insensitive
+    keys, LLM_CACHE_STATS counters). Installed lazily by the first get_llm()
+    (and the API's startup hook), not at import; an unavailable backend is
+    logged and falls back to memory.
+    """
+    global _llm_cache_configured
+    if _llm_cache_configured:
+        return
+    _llm_cache_configured = True
+
+    mode = os.getenv("HOMENET_CACHE", "memory").strip().lower()
+    if mode == "off":
+        return
+    if mode == "semantic":
+        try:
+            from langchain_community.cache import GPTCache
+            set_llm_cache(GPTCache(_init_gptcache))
+            return
+        except Exception as exc:
+            # gptcache/langchain-community not installed -> in-process cache.
+            logger.warning("Semantic LLM cache unavailable (%s); using in-memory cache", exc)
+    elif mode == "sqlite":
+        try:
+            from langchain_community.cache import SQLiteCache
+            set_llm_cache(NormalizingCache(SQLiteCache(database_path=LLM_CACHE_DB_PATH)))
+            return
+        except Exception as exc:
+            # langchain-community missing or DB not writable -> still dedupe in-process.
+            logger.warning("SQLite LLM cache unavailable (%s); using in-memory cache", exc)
+    elif mode != "memory":
+        logger.warning("Unknown HOMENET_CACHE=%r; using in-memory cache", mode)
+
+    set_llm_cache(NormalizingCache(BoundedInMemoryCache()))
+
+
+DEFAULT_MODEL = "meta-llama/llama-3.1-70b-instruct"
+CHEAP_MODEL = "meta-llama/llama-3.1-8b-instruct"
+
+# Cascade counters (calls = cheap-model attempts) for tuning the escalation rate.
+CASCADE_STATS = {"calls": 0, "escalations": 0}
+
+
+@lru_cache(maxsize=8)
+def get_llm(model=DEFAULT_MODEL, temperature=0, json_mode=False):
     """
     Get configured OpenRouter LLM instance
     
@@ -18,12 +165,26 @@ def get_llm(model="meta-llama/llama-3.1-70b-instruct", temperature=0):
     - anthropic/claude-3.5-sonnet (best reasoning)
     - google/gemini-pro (good balance)
     - mistralai/mixtral-8x7b-instruct (efficient)
+    
+    json_mode=True asks the provider for a single JSON object reply.
+    
+    Instances are memoized per (model, temperature, json_mode) so agent calls
+    share one client and its pooled HTTP connections.
     """
+    # Every entry point (API, CLI, LangGraph scripts) reaches the LLM through here
+    configure_llm_cache()
+    
     api_key = os.getenv("OPENROUTER_API_KEY")
     
     if not api_key:
         raise ValueError("OPENROUTER_API_KEY not found in .env file")
     
+    # Prompts put their static text first so providers with automatic prefix
+    # caching can reuse it; no per-model opt-in is sent.
+    model_kwargs = {}
+    if json_mode:
+        model_kwargs["response_format"] = {"type": "json_object"}
+    
     return ChatOpenAI(
         model=model,
         temperature=temperature,
@@ -32,5 +193,66 @@ def get_llm(model="meta-llama/llama-3.1-70b-instruct", temperature=0):
         default_headers={
             "HTTP-Referer": "https://homenet-poc.local",
             "X-Title": "HomeNet Predictive Maintenance POC"
-        }
+        },
+        model_kwargs=model_kwargs,
     )
+
+
+def parse_json_reply(content: str, schema: Type[BaseModel]) -> BaseModel:
+    """Validate a JSON reply into `schema`, tolerating prose/code fences around the object."""
+    start, end = content.find("{"), content.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError(f"No JSON object in LLM reply: {content[:80]!r}")
+    return schema.model_validate_json(content[start:end + 1])
+
+
+def get_structured_llm(schema: Type[BaseModel], model=DEFAULT_MODEL, temperature=0):
+    """JSON-mode LLM whose `invoke()` returns a validated `schema` instance."""
+    llm = get_llm(model=model, temperature=temperature, json_mode=True)
+    return llm | RunnableLambda(lambda msg: parse_json_reply(msg.content, schema))
+
+
+async def ainvoke_with_cascade(messages, schema: Type[BaseModel], is_valid: Optional[Callable] = None):
+    """
+    FrugalGPT-style cascade: ask CHEAP_MODEL first and only escalate to
+    DEFAULT_MODEL when its reply does not validate against `schema`
+    (or fails the extra `is_valid` check).
+
+    Any other cheap-model failure (auth, rate limit, network) is logged
+    before escalating, so it doesn't silently double the paid calls.
+
+    Returns the validated `schema` instance from whichever model answered last.
+    """
+    CASCADE_STATS["calls"] += 1
+    try:
+        decision = await get_structured_llm(schema, model=CHEAP_MODEL).ainvoke(messages)
+        if is_valid is None or is_valid(decision):
+            return decision
+    except (ValidationError, ValueError):
+        # Unparseable or schema-invalid reply -> escalate.
+        pass
+    except Exception as exc:
+        logger.warning("Cheap model %s failed (%s); escalating to %s", CHEAP_MODEL, exc, DEFAULT_MODEL)
+
+    CASCADE_STATS["escalations"] += 1
+    return await get_structured_llm(schema, model=DEFAULT_MODEL).ainvoke(messages)
+
+
+_agent_loop = None
+_agent_loop_lock = threading.Lock()
+
+
+def run_async(coro):
+    """
+    Run an agent coroutine from sync code and return its result.
+
+    Everything runs on one long-lived background event loop: the memoized
+    ChatOpenAI clients keep async HTTP pools bound to the loop that first
+    used them, so a fresh asyncio.run() loop per call would break them.
+    """
+    global _agent_loop
+    with _agent_loop_lock:
+        if _agent_loop is None:
+            _agent_loop = asyncio.new_event_loop()
+            threading.Thread(target=_agent_loop.run_forever, name="agent-loop", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _agent_loop).result()
@@ -1,19 +1,54 @@
 ﻿"""
 Maintenance Agent - LLM-powered analysis with LangGraph (safe message updates)
 """
+import asyncio
 import sys
 import os
+from typing import Literal, Optional
 
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, parent_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
 
 models_path = os.path.join(parent_dir, "models", "predictive_maintenance")
-sys.path.insert(0, models_path)
+if models_path not in sys.path:
+    sys.path.insert(0, models_path)
 
 from models.predictive_maintenance.predict import predict_failure_risk
 from agents.state import AgentState
-from agents.llm_config import get_llm
+from agents.llm_config import ainvoke_with_cascade
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from pydantic import BaseModel, Field
+
+
+MAINTENANCE_SYSTEM_PROMPT = "You are an expert maintenance engineer AI assistant."
+
+# Invariant system message, built once and shared by every call.
+_MAINT_SYSTEM_MSG = SystemMessage(content=MAINTENANCE_SYSTEM_PROMPT)
+
+MAINTENANCE_STATIC_RULES = """You are an AI maintenance agent analyzing pump failure risk.
+
+Using the pump data below, decide:
+action_required: true/false
+action_type: urgent_inspection | scheduled_maintenance | enhanced_monitoring | none
+priority: CRITICAL | HIGH | MEDIUM | LOW
+sla_hours: 4 | 24 | 72 | null
+reasoning: max 2 sentences
+"""
+
+MAINTENANCE_RESPONSE_FORMAT = """
+Return ONLY a JSON object:
+{"action_required": true, "action_type": "...", "priority": "...", "sla_hours": 24, "reasoning": "..."}
+"""
+
+
+class MaintenanceDecision(BaseModel):
+    """Structured maintenance decision returned by the LLM (JSON mode)."""
+    action_required: bool
+    action_type: Literal["urgent_inspection", "scheduled_maintenance", "enhanced_monitoring", "none"]
+    priority: Literal["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+    sla_hours: Optional[int] = None
+    reasoning: str = Field(min_length=1)
 
 
 def _merge_state(state: AgentState, updates: dict) -> AgentState:
@@ -27,7 +62,7 @@ def _merge_state(state: AgentState, updates: dict) -> AgentState:
     return new_state
 
 
-def maintenance_agent_node(state: AgentState) -> AgentState:
+async def maintenance_agent_node(state: AgentState) -> AgentState:
     pump_id = state.get("pump_id")
 
     updates = {
@@ -37,7 +72,8 @@ def maintenance_agent_node(state: AgentState) -> AgentState:
     }
 
     try:
-        prediction = predict_failure_risk(pump_id, horizon_hours=48)
+        # ML scoring runs in a worker thread so the event loop stays free for LLM I/O.
+        prediction = await asyncio.to_thread(predict_failure_risk, pump_id, horizon_hours=48)
         
         # If model isn't trained, use intelligent fallback based on tank level from state
         if prediction.get("risk_level") == "UNKNOWN":
@@ -78,10 +114,8 @@ def maintenance_agent_node(state: AgentState) -> AgentState:
             "current_metrics": prediction["current_metrics"],
         })
 
-        llm = get_llm()
-
-        prompt = f"""You are an AI maintenance agent analyzing pump failure risk.
-
+        # Static instructions go first so providers can reuse the cached prefix.
+        prompt = MAINTENANCE_STATIC_RULES + MAINTENANCE_RESPONSE_FORMAT + f"""
 PUMP: {pump_id}
 RISK SCORE: {prediction['risk_score']:.1%}
 RISK LEVEL: {prediction['risk_level']}
@@ -93,43 +127,23 @@ CURRENT METRICS:
 
 FAILURE SIGNALS:
 {chr(10).join(f"- {signal}" for signal in prediction['signals'])}
-
-Decide:
-ACTION_REQUIRED: true/false
-ACTION_TYPE: urgent_inspection | scheduled_maintenance | enhanced_monitoring | none
-PRIORITY: CRITICAL | HIGH | MEDIUM | LOW
-SLA_HOURS: 4 | 24 | 72 | null
-REASONING: max 2 sentences
-
-Return EXACTLY:
-ACTION_REQUIRED: ...
-ACTION_TYPE: ...
-PRIORITY: ...
-SLA_HOURS: ...
-REASONING: ...
 """
 
-        resp = llm.invoke([
-            SystemMessage(content="You are an expert maintenance engineer AI assistant."),
-            HumanMessage(content=prompt),
-        ])
-
-        llm_decision = {}
-        for line in resp.content.strip().split("\n"):
-            if ":" in line:
-                k, v = line.split(":", 1)
-                llm_decision[k.strip()] = v.strip()
-
-        action_required = llm_decision.get("ACTION_REQUIRED", "false").lower() == "true"
-        action_type = llm_decision.get("ACTION_TYPE", "none")
-        priority = llm_decision.get("PRIORITY", "LOW")
-        reasoning = llm_decision.get("REASONING", "No reasoning provided")
-
-        sla_raw = llm_decision.get("SLA_HOURS", "null")
-        try:
-            sla_hours = int(sla_raw) if sla_raw != "null" else None
-        except Exception:
-            sla_hours = None
+        # Cheap model first; escalate to the 70B model only if its JSON fails validation.
+        decision = await ainvoke_with_cascade(
+            [
+                _MAINT_SYSTEM_MSG,
+                HumanMessage(content=prompt),
+            ],
+            MaintenanceDecision,
+            is_valid=lambda d: bool(d.reasoning.strip()),
+        )
+
+        action_required = decision.action_required
+        action_type = decision.action_type
+        priority = decision.priority
+        sla_hours = decision.sla_hours
+        reasoning = decision.reasoning
 
         updates.update({
             "action_required": action_required,
@@ -142,7 +156,7 @@ REASONING: ...
         # If task needed, add exactly once
         if action_required:
             task_id = f"TASK_{pump_id}"
-            existing = any(t.get("task_id") == task_id for t in state.get("tasks", []))
+            existing = task_id in state.get("task_ids", set())
             if not existing:
                 task = {
                     "task_id": task_id,
@@ -154,6 +168,7 @@ REASONING: ...
                     "asset_id": pump_id,
                 }
                 updates["tasks"] = state.get("tasks", []) + [task]
+                updates["task_ids"] = state.get("task_ids", set()) | {task_id}
                 updates["task_title"] = task["title"]
                 updates["task_description"] = task["description"]
                 updates["messages"] = updates["messages"] + [AIMessage(content=f"⚠️ {priority}: {pump_id} requires {action_type}")]
@@ -176,13 +191,14 @@ REASONING: ...
 
 if __name__ == "__main__":
     from agents.state import build_agent_state
+    from agents.llm_config import run_async
 
     print("=" * 70)
     print("🤖 AI MAINTENANCE AGENT TEST (with LLM)")
     print("=" * 70)
 
     s = build_agent_state(site_id="SITE_001", pump_id="PUMP_BLD_001_01")
-    out = maintenance_agent_node(s)
+    out = run_async(maintenance_agent_node(s))
 
     print(f"\nPump: {out['pump_id']}")
     print(f"Risk: {out['risk_score']:.1%} ({out['risk_level']})")
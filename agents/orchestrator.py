@@ -1,18 +1,24 @@
 """
 Main Orchestrator - Site-wide monitoring using LangGraph workflow
 """
+import asyncio
+import io
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from typing import Any, Optional
-from services.water_state import WATER_STATE
 
-parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, parent_dir)
+if __name__ == "__main__":
+    # Script entry point (python agents/<module>.py): make project packages importable.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from agents.langgraph_workflow import run_langgraph_workflow
+from services.water_state import WATER_STATE
+from agents.langgraph_workflow import run_langgraph_workflow, arun_langgraph_workflow
 from typing import List, Dict
 from agents.forecast_agent import run_forecast_agent
+from agents.llm_config import run_async
 from services.technician_service import get_available_pump_technicians
 
 CONFIG = {
@@ -23,6 +29,9 @@ CONFIG = {
     "pressure_low": 30,
 }
 
+# Worker threads for running independent agent analyses concurrently.
+_AGENT_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="supervisor-agent")
+
 # Site configuration
 SITES = {
     "SITE_001": {
@@ -518,8 +527,22 @@ def supervisor_run(
         mode,
     )
 
-    if agent_plan["run_forecast_agent"]:
-        forecast_result = _run_forecast_via_agent(building_id=building_id, tank_pct=tank_pct)
+    pump_id = pump_status.get("pump_id") or f"PUMP_{building_id}_01"
+
+    # Forecast and maintenance analyses are independent: run them side by side.
+    forecast_future = (
+        _AGENT_EXECUTOR.submit(_run_forecast_via_agent, building_id=building_id, tank_pct=tank_pct)
+        if agent_plan["run_forecast_agent"]
+        else None
+    )
+    langgraph_future = (
+        _AGENT_EXECUTOR.submit(_get_langgraph_analysis, pump_id=pump_id, tank_pct=tank_pct)
+        if agent_plan["run_maintenance_agent"]
+        else None
+    )
+
+    if forecast_future is not None:
+        forecast_result = forecast_future.result()
     else:
         forecast_result = {
             "status": "skipped",
@@ -530,9 +553,8 @@ def supervisor_run(
             "recommendation": "Forecast agent not triggered by supervisor.",
         }
 
-    pump_id = pump_status.get("pump_id") or f"PUMP_{building_id}_01"
-    if agent_plan["run_maintenance_agent"]:
-        langgraph_result = _get_langgraph_analysis(pump_id=pump_id, tank_pct=tank_pct)
+    if langgraph_future is not None:
+        langgraph_result = langgraph_future.result()
     else:
         langgraph_result = {
             "status": "skipped",
@@ -584,22 +606,20 @@ def execution_layer(
     Execution layer: side-effects only (persist tasks + emit notifications).
     Returns created artifacts for UI.
     """
-    created_tasks: List[Dict[str, Any]] = []
-    for intent in task_intents:
-        asset_id = intent.get("asset_id")
-        if not asset_id:
-            continue
-        created_tasks.append(
-            task_service.create_task(
-                title=intent["title"],
-                description=intent["description"],
-                asset_type=intent["asset_type"],
-                asset_id=asset_id,
-                building_id=building_id,
-                priority=intent["priority"],
-                sla_hours=intent["sla_hours"],
-            )
-        )
+    # Persist all task intents in one batch (single commit for the DB service).
+    created_tasks: List[Dict[str, Any]] = task_service.create_tasks([
+        {
+            "title": intent["title"],
+            "description": intent["description"],
+            "asset_type": intent["asset_type"],
+            "asset_id": intent["asset_id"],
+            "building_id": building_id,
+            "priority": intent["priority"],
+            "sla_hours": intent["sla_hours"],
+        }
+        for intent in task_intents
+        if intent.get("asset_id")
+    ])
 
     created_notifications: List[Dict[str, Any]] = []
     for idx, intent in enumerate(notification_intents):
@@ -713,6 +733,14 @@ def run_water_orchestration(
     }
 
 
+async def _analyze_pumps(pump_ids: List[str]) -> List[Any]:
+    """Run the LangGraph workflow for every pump concurrently (exceptions returned in place)."""
+    return await asyncio.gather(
+        *(arun_langgraph_workflow(pump_id) for pump_id in pump_ids),
+        return_exceptions=True,
+    )
+
+
 def monitor_site(site_id: str) -> Dict:
     """
     Monitor all assets at a site using LangGraph AI agents
@@ -739,13 +767,18 @@ def monitor_site(site_id: str) -> Dict:
         "details": []
     }
     
-    # Analyze each pump using LangGraph workflow
-    for pump_id in site_config["pumps"]:
-        print(f"🔍 Analyzing {pump_id} with AI agents...")
-        
+    pumps = site_config["pumps"]
+    print("".join(f"🔍 Analyzing {pump_id} with AI agents...\n" for pump_id in pumps), end="")
+    
+    # Run full LangGraph workflow (ML + LLM + Routing) for all pumps at once;
+    # wall time is the slowest pump instead of the sum.
+    workflow_results = run_async(_analyze_pumps(pumps))
+    
+    # Aggregate sequentially, in site order
+    for pump_id, workflow_result in zip(pumps, workflow_results):
         try:
-            # Run full LangGraph workflow (ML + LLM + Routing)
-            workflow_result = run_langgraph_workflow(pump_id)
+            if isinstance(workflow_result, Exception):
+                raise workflow_result
             
             results["pumps_analyzed"] += 1
             
@@ -797,46 +830,50 @@ def print_summary(results: Dict):
     """
     Print formatted summary of monitoring results
     """
-    print("\n" + "="*70)
-    print("📊 SITE MONITORING SUMMARY (LangGraph AI)")
-    print("="*70)
+    # Buffer the whole summary and write it once, so concurrent runs don't interleave.
+    buf = io.StringIO()
+    emit = partial(print, file=buf)
+    emit("\n" + "="*70)
+    emit("📊 SITE MONITORING SUMMARY (LangGraph AI)")
+    emit("="*70)
     
-    print(f"\n🏢 Site: {results['site_name']} ({results['site_id']})")
-    print(f"⏰ Timestamp: {results['timestamp']}")
+    emit(f"\n🏢 Site: {results['site_name']} ({results['site_id']})")
+    emit(f"⏰ Timestamp: {results['timestamp']}")
     
-    print(f"\n📈 ANALYSIS RESULTS:")
-    print(f"   Pumps Analyzed: {results['pumps_analyzed']}")
-    print(f"   Tasks Created: {len(results['tasks_created'])}")
-    print(f"   Technicians Assigned: {len(results['assignments'])}")
+    emit(f"\n📈 ANALYSIS RESULTS:")
+    emit(f"   Pumps Analyzed: {results['pumps_analyzed']}")
+    emit(f"   Tasks Created: {len(results['tasks_created'])}")
+    emit(f"   Technicians Assigned: {len(results['assignments'])}")
     
-    print(f"\n🚨 PRIORITY BREAKDOWN:")
-    print(f"   🔴 CRITICAL: {results['critical_count']}")
-    print(f"   🟠 HIGH:     {results['high_count']}")
-    print(f"   🟡 MEDIUM:   {results['medium_count']}")
-    print(f"   🟢 LOW:      {results['low_count']}")
+    emit(f"\n🚨 PRIORITY BREAKDOWN:")
+    emit(f"   🔴 CRITICAL: {results['critical_count']}")
+    emit(f"   🟠 HIGH:     {results['high_count']}")
+    emit(f"   🟡 MEDIUM:   {results['medium_count']}")
+    emit(f"   🟢 LOW:      {results['low_count']}")
     
     if results['tasks_created']:
-        print(f"\n📋 TASKS CREATED:")
+        emit(f"\n📋 TASKS CREATED:")
         for idx, task in enumerate(results['tasks_created'], 1):
-            print(f"\n   Task {idx}:")
-            print(f"   {task['priority']}: {task['title']}")
-            print(f"   SLA: {task['sla_hours']} hours")
-            print(f"   Asset: {task['asset_id']}")
-            print(f"   Action: {task['action_type']}")
+            emit(f"\n   Task {idx}:")
+            emit(f"   {task['priority']}: {task['title']}")
+            emit(f"   SLA: {task['sla_hours']} hours")
+            emit(f"   Asset: {task['asset_id']}")
+            emit(f"   Action: {task['action_type']}")
     
     if results['assignments']:
-        print(f"\n👷 TECHNICIAN ASSIGNMENTS:")
+        emit(f"\n👷 TECHNICIAN ASSIGNMENTS:")
         for idx, assignment in enumerate(results['assignments'], 1):
-            print(f"\n   Assignment {idx}:")
-            print(f"   Task: {assignment['task_id']}")
-            print(f"   Technician: {assignment['technician_name']}")
-            print(f"   Priority: {assignment['priority']}")
-            print(f"   Status: {assignment['status']}")
+            emit(f"\n   Assignment {idx}:")
+            emit(f"   Task: {assignment['task_id']}")
+            emit(f"   Technician: {assignment['technician_name']}")
+            emit(f"   Priority: {assignment['priority']}")
+            emit(f"   Status: {assignment['status']}")
     
     if not results['tasks_created']:
-        print(f"\n✅ No urgent tasks required - all assets operating normally")
+        emit(f"\n✅ No urgent tasks required - all assets operating normally")
     
-    print("\n" + "="*70)
+    emit("\n" + "="*70)
+    sys.stdout.write(buf.getvalue())
     
     if WATER_STATE:
         WATER_STATE.ai_summary = results
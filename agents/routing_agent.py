@@ -5,46 +5,53 @@ LangGraph-safe: returns message deltas (for add_messages reducer).
 import sys
 import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, FrozenSet, Iterable, Optional
 
-parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, parent_dir)
+if __name__ == "__main__":
+    # Script entry point (python agents/<module>.py): make project packages importable.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from agents.state import AgentState
+from agents.state import AgentState, build_agent_state
 from langchain_core.messages import AIMessage
 from services.technician_service import load_technicians
 
 
-def get_required_skills(action_type: str) -> List[str]:
+# Built once at import; callers share these immutable sets.
+SKILL_MAP = {
+    "urgent_inspection": frozenset({"pumps", "diagnostics"}),
+    "scheduled_maintenance": frozenset({"pumps", "mechanical"}),
+    "enhanced_monitoring": frozenset({"sensors"}),
+    "capacity_alert": frozenset({"pumps", "electrical"}),
+    "capacity_monitoring": frozenset({"sensors"}),
+}
+DEFAULT_SKILLS = frozenset({"general"})
+
+
+def get_required_skills(action_type: str) -> FrozenSet[str]:
     """Determine required skills based on action type."""
-    skill_map = {
-        "urgent_inspection": ["pumps", "diagnostics"],
-        "scheduled_maintenance": ["pumps", "mechanical"],
-        "enhanced_monitoring": ["sensors"],
-        "capacity_alert": ["pumps", "electrical"],
-        "capacity_monitoring": ["sensors"],
-    }
-    return skill_map.get(action_type, ["general"])
+    return SKILL_MAP.get(action_type, DEFAULT_SKILLS)
 
 
 def assign_technician(
     task: Dict,
-    required_skills: List[str],
+    required_skills: Iterable[str],
     technicians: Dict[str, Dict],
 ) -> Optional[str]:
     """Find best available technician for a task."""
-    candidates = []
-
-    # Priority 1: available + skill match, lowest load wins
-    for tech_id, tech in technicians.items():
-        if not tech["available"]:
-            continue
-        if any(skill in tech["skills"] for skill in required_skills):
-            candidates.append((tech_id, tech["current_load"]))
-
-    candidates.sort(key=lambda x: x[1])
-    if candidates:
-        return candidates[0][0]
+    required = frozenset(required_skills)  # no copy when already a frozenset
+
+    # Priority 1: available + skill match, lowest load wins (first one on ties)
+    best = min(
+        (
+            (tech["current_load"], tech_id)
+            for tech_id, tech in technicians.items()
+            if tech["available"] and not required.isdisjoint(tech.get("skills_set", tech["skills"]))
+        ),
+        key=lambda x: x[0],
+        default=None,
+    )
+    if best:
+        return best[1]
 
     # Priority 2: any available tech
     for tech_id, tech in technicians.items():
@@ -59,17 +66,29 @@ def routing_agent_node(state: AgentState) -> Dict:
     LangGraph node: return ONLY state updates (including messages as deltas).
     """
     new_messages = [AIMessage(content="🔀 Routing Agent assigning tasks")]
-    technicians = load_technicians()
+    # Work on a copy of the pool carried in state (or a fresh CSV load); the
+    # updated loads are returned as a state update, never mutated in place.
+    technicians = {
+        tech_id: dict(tech)
+        for tech_id, tech in (state.get("technicians") or load_technicians()).items()
+    }
+    # Skill sets built once per routing cycle, not per task.
+    for tech in technicians.values():
+        tech["skills_set"] = frozenset(tech["skills"])
 
     tasks = state.get("tasks", [])
     existing_assignments = state.get("assignments", []) or []
     new_assignments = []
+    assigned_ids = {a.get("task_id") for a in existing_assignments}
+    escalated = 0
+    # All assignments from one routing run share a timestamp.
+    assigned_at = datetime.now().isoformat()
 
     for task in tasks:
         task_id = task.get("task_id")
 
         # Skip if already assigned
-        if any(a.get("task_id") == task_id for a in existing_assignments):
+        if task_id in assigned_ids:
             continue
 
         required_skills = get_required_skills(task.get("action_type", "general"))
@@ -83,7 +102,7 @@ def routing_agent_node(state: AgentState) -> Dict:
                 "technician_name": technicians[tech_id]["name"],
                 "priority": task.get("priority"),
                 "sla_hours": task.get("sla_hours"),
-                "assigned_at": datetime.now().isoformat(),
+                "assigned_at": assigned_at,
                 "status": "assigned",
             }
             new_assignments.append(assignment)
@@ -92,10 +111,6 @@ def routing_agent_node(state: AgentState) -> Dict:
             technicians[tech_id]["current_load"] += 1
             if technicians[tech_id]["current_load"] >= technicians[tech_id]["max_capacity"]:
                 technicians[tech_id]["available"] = False
-
-            new_messages.append(
-                AIMessage(content=f"✅ Assigned {task_id} to {technicians[tech_id]['name']}")
-            )
         else:
             assignment = {
                 "task_id": task_id,
@@ -104,18 +119,24 @@ def routing_agent_node(state: AgentState) -> Dict:
                 "technician_name": "ESCALATED - No available technician",
                 "priority": task.get("priority"),
                 "sla_hours": task.get("sla_hours"),
-                "assigned_at": datetime.now().isoformat(),
+                "assigned_at": assigned_at,
                 "status": "escalated",
             }
             new_assignments.append(assignment)
-            new_messages.append(
-                AIMessage(content=f"⚠️ ESCALATED {task_id} - No technician available")
-            )
+            escalated += 1
+
+    # One summary message per run; per-task detail lives in `assignments`.
+    routed = len(new_assignments)
+    icon = "⚠️" if escalated else "✅"
+    new_messages.append(
+        AIMessage(content=f"{icon} Routed {routed - escalated}/{routed} tasks, {escalated} escalated")
+    )
 
     return {
         "current_agent": "routing",
         "next_agent": "end",
         "assignments": existing_assignments + new_assignments,
+        "technicians": technicians,
         "messages": new_messages,  # IMPORTANT: only new messages; add_messages will merge
     }
 
@@ -124,8 +145,6 @@ def run_routing_agent(tasks: List[Dict]) -> Dict:
     """
     Standalone runner (outside LangGraph).
     """
-    from agents.state import build_agent_state
-
     state = build_agent_state(site_id="SITE_001")
     state["tasks"] = tasks
 
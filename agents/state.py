@@ -1,11 +1,31 @@
 ﻿"""
 LangGraph State Management - Typed state for agent workflow
 """
-from typing import TypedDict, Annotated, List, Dict, Optional
+from types import MappingProxyType
+from typing import TypedDict, Annotated, List, Dict, Optional, Set
 
 from langgraph.graph.message import add_messages
 from langchain_core.messages import BaseMessage
 
+__all__ = ["AgentState", "build_agent_state", "add_recent_messages"]
+
+# Trace messages kept in state; older ones are dropped as new ones arrive.
+MAX_STATE_MESSAGES = 50
+
+
+def add_recent_messages(left, right):
+    """
+    add_messages reducer capped to the last MAX_STATE_MESSAGES entries.
+    Back-to-back AI messages with identical content (node retries) are collapsed.
+    """
+    merged = []
+    for msg in add_messages(left, right):
+        prev = merged[-1] if merged else None
+        if prev is not None and msg.type == "ai" and prev.type == "ai" and msg.content == prev.content:
+            continue
+        merged.append(msg)
+    return merged[-MAX_STATE_MESSAGES:]
+
 
 class AgentState(TypedDict):
     # Input
@@ -13,6 +33,7 @@ class AgentState(TypedDict):
     pump_id: Optional[str]
     building_id: Optional[str]
     tank_pct: Optional[float]
+    force_refresh: Optional[bool]
 
     # ML Predictions
     risk_score: Optional[float]
@@ -36,42 +57,63 @@ class AgentState(TypedDict):
     task_title: Optional[str]
     task_description: Optional[str]
     tasks: List[Dict]
+    task_ids: Set[str]  # index of tasks[*].task_id for O(1) duplicate checks
     assignments: List[Dict]
+    technicians: Optional[Dict[str, Dict]]  # routing pool; None -> load from CSV
 
     # Workflow control
-    messages: Annotated[List[BaseMessage], add_messages]
+    messages: Annotated[List[BaseMessage], add_recent_messages]
     current_agent: Optional[str]
     next_agent: Optional[str]
 
 
+# Immutable defaults, copied per call; list/set fields are created fresh in
+# build_agent_state() so states never share them.
+_STATE_TEMPLATE = MappingProxyType({
+    "site_id": None,
+    "pump_id": None,
+    "building_id": None,
+    "tank_pct": 50.0,
+    "force_refresh": False,
+
+    "risk_score": None,
+    "risk_level": None,
+    "failure_signals": None,
+    "current_metrics": None,
+
+    "current_demand": None,
+    "predicted_demand": None,
+    "peak_time": None,
+
+    "action_required": False,
+    "action_type": None,
+    "priority": None,
+    "sla_hours": None,
+    "reasoning": None,
+
+    "task_title": None,
+    "task_description": None,
+    "tasks": None,
+    "task_ids": None,
+    "assignments": None,
+    "technicians": None,
+
+    "messages": None,
+    "current_agent": None,
+    "next_agent": None,
+})
+
+
 def build_agent_state(site_id: str, pump_id: str = None, building_id: str = None, tank_pct: float = 50.0) -> AgentState:
-    return {
-        "site_id": site_id,
-        "pump_id": pump_id,
-        "building_id": building_id,
-        "tank_pct": tank_pct,
-
-        "risk_score": None,
-        "risk_level": None,
-        "failure_signals": None,
-        "current_metrics": None,
-
-        "current_demand": None,
-        "predicted_demand": None,
-        "peak_time": None,
-
-        "action_required": False,
-        "action_type": None,
-        "priority": None,
-        "sla_hours": None,
-        "reasoning": None,
-
-        "task_title": None,
-        "task_description": None,
-        "tasks": [],
-        "assignments": [],
-
-        "messages": [],
-        "current_agent": None,
-        "next_agent": None,
-    }
+    state = dict(_STATE_TEMPLATE)
+    state.update(
+        site_id=site_id,
+        pump_id=pump_id,
+        building_id=building_id,
+        tank_pct=tank_pct,
+        tasks=[],
+        task_ids=set(),
+        assignments=[],
+        messages=[],
+    )
+    return state
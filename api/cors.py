@@ -0,0 +1,70 @@
+"""
+Allow-all CORS as a thin ASGI middleware.
+
+Same policy the app used via CORSMiddleware(allow_origins=["*"],
+allow_credentials=True, allow_methods=["*"], allow_headers=["*"]), but with
+the preflight response and header values prebuilt once.
+"""
+from typing import Iterable
+
+ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+
+# Preflight headers that never change (origin / requested headers are echoed per request).
+_PREFLIGHT_HEADERS = [
+    (b"access-control-allow-methods", ALLOW_METHODS),
+    (b"access-control-allow-credentials", b"true"),
+    (b"access-control-max-age", b"600"),
+    (b"vary", b"Origin"),
+    (b"content-length", b"0"),
+]
+
+_SIMPLE_HEADERS = [
+    (b"access-control-allow-credentials", b"true"),
+    (b"vary", b"Origin"),
+]
+
+
+class OpenCORSMiddleware:
+    def __init__(self, app, skip_paths: Iterable[str] = ("/health",)):
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        requested_headers = None
+        is_preflight = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                is_preflight = True
+            elif name == b"access-control-request-headers":
+                requested_headers = value
+
+        # Not a cross-origin request
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if is_preflight and scope["method"] == "OPTIONS":
+            headers = [(b"access-control-allow-origin", origin), *_PREFLIGHT_HEADERS]
+            if requested_headers:
+                headers.append((b"access-control-allow-headers", requested_headers))
+            await send({"type": "http.response.start", "status": 204, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"access-control-allow-origin", origin),
+                    *_SIMPLE_HEADERS,
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
@@ -1,5 +1,5 @@
 ﻿from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from api.routes import tasks, assets, reports
 from services.task_service import TaskService
@@ -8,9 +8,13 @@ from db.session import init_db
 from services.notification_service import NotificationService
 from api.routes import alerts
 from api.routes import water_state
+from api.cors import OpenCORSMiddleware
+from agents.llm_config import configure_llm_cache, LLM_CACHE_STATS, CASCADE_STATS
+from models.predictive_maintenance.predict import warm_model_cache
 
 
-app = FastAPI(title="HOMENET Water POC")
+# orjson serializes the forecast series / task lists much faster than stdlib json
+app = FastAPI(title="HOMENET Water POC", default_response_class=ORJSONResponse)
 
 # ✅ Create SINGLE global TaskService
 app.state.notification_service = NotificationService()
@@ -18,21 +22,24 @@ app.state.notification_service = NotificationService()
 app.include_router(alerts.router, tags=["alerts"])
 
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Open CORS for the POC (prebuilt headers; /health bypasses it)
+app.add_middleware(OpenCORSMiddleware)
 
 @app.get("/health")
 def health():
     return {"status": "ok", "service": "homenet-water-poc"}
 
+@app.get("/metrics")
+def metrics():
+    return {"llm_cache": dict(LLM_CACHE_STATS), "llm_cascade": dict(CASCADE_STATS)}
+
 @app.on_event("startup")
 def startup():
     init_db()
+    # Shared LLM response cache for every agent call (no-op if already installed)
+    configure_llm_cache()
+    # Pump model + readings loaded once here, not on the first maintenance run
+    warm_model_cache()
 
 
 app.include_router(tasks.router, tags=["tasks"])
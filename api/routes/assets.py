@@ -1,14 +1,15 @@
-﻿from fastapi import APIRouter, Depends
+﻿from functools import lru_cache
+
+from fastapi import APIRouter, Depends
 from typing import Any, Dict, List
 from services.asset_service import AssetService
 
 router = APIRouter()
 
 
+@lru_cache(maxsize=1)
 def get_asset_service() -> AssetService:
-    if not hasattr(get_asset_service, "_instance"):
-        get_asset_service._instance = AssetService()
-    return get_asset_service._instance
+    return AssetService()
 
 
 @router.get("/water/tanks", response_model=None)
@@ -1,55 +1,65 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from typing import Any, Dict
+import io
+import sys
+from functools import lru_cache, partial
+
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import ORJSONResponse
+from typing import Any, Dict, List
 
 from api.dependencies import get_task_service, get_notification_service
 from services.asset_service import AssetService
 from services.task_service import TaskService
 from services.notification_service import NotificationService
 from agents.orchestrator import run_water_orchestration
-from agents.forecast_agent import run_forecast_agent
+from agents.forecast_agent import run_forecast_agent, FORECAST_CACHE_TTL_SECONDS
+from models.demand_forecast.predict import forecast_water_demand_batch
 from services.water_state import WATER_STATE
 
 router = APIRouter()
 
+@lru_cache(maxsize=1)
 def get_asset_service() -> AssetService:
-    if not hasattr(get_asset_service, "_instance"):
-        get_asset_service._instance = AssetService()
-    return get_asset_service._instance
+    return AssetService()
 
 
 def print_supervisor_summary(result: dict) -> None:
-    print("\n" + "=" * 70)
-    print("🏠 HOMENET WATER SUPERVISOR RUN SUMMARY")
-    print("=" * 70)
+    # One buffered write per run instead of a write per line.
+    buf = io.StringIO()
+    emit = partial(print, file=buf)
+
+    emit("\n" + "=" * 70)
+    emit("🏠 HOMENET WATER SUPERVISOR RUN SUMMARY")
+    emit("=" * 70)
 
-    print(f"🏢 Building: {result.get('building_id')}")
+    emit(f"🏢 Building: {result.get('building_id')}")
 
     tank = result.get("tank_status", {})
-    print("\n🛢️ Tank:")
-    print(
+    emit("\n🛢️ Tank:")
+    emit(
         f"   {tank.get('tank_id')} | "
         f"{tank.get('level_percentage')}% | "
         f"{tank.get('level_state')}"
     )
 
     forecast = result.get("forecast", {})
-    print("\n📈 Forecast:")
-    print(
+    emit("\n📈 Forecast:")
+    emit(
         f"   Level: {forecast.get('demand_level')} | "
         f"Total: {forecast.get('forecast_total')} L"
     )
 
     tasks = result.get("created_tasks", [])
-    print("\n📝 Tasks:")
+    emit("\n📝 Tasks:")
     if not tasks:
-        print("   None")
+        emit("   None")
     else:
         for t in tasks:
-            print(f"   {t['task_id']} | {t['priority']} | {t['title']}")
+            emit(f"   {t['task_id']} | {t['priority']} | {t['title']}")
 
-    print("=" * 70 + "\n")
+    emit("=" * 70 + "\n")
+    sys.stdout.write(buf.getvalue())
 
 @router.get("/water/status")
 def get_water_status():
@@ -58,11 +68,13 @@ def get_water_status():
     return WATER_STATE.__dict__
 
 @router.get("/forecast/{building_id}", response_model=None)
-def forecast(building_id: str, tank_pct: float = None) -> Dict[str, Any]:
+def forecast(building_id: str, response: Response, tank_pct: float = None) -> Dict[str, Any]:
     """
     Get water demand forecast.
     Optional tank_pct parameter: if provided, adjusts urgency based on current tank level.
     """
+    # ML forecasts are reused server-side for this long; let clients do the same.
+    response.headers["Cache-Control"] = f"private, max-age={FORECAST_CACHE_TTL_SECONDS}"
     agent_out = run_forecast_agent(building_id=building_id)
     raw = agent_out.get("ml_forecast_raw") or {}
     demand_level = str(raw.get("demand_level", agent_out.get("demand_level", "LOW"))).upper()
@@ -88,6 +100,30 @@ def forecast(building_id: str, tank_pct: float = None) -> Dict[str, Any]:
     }
 
 
+@router.get("/forecasts", response_model=None)
+def forecast_batch(
+    response: Response,
+    building_ids: List[str] = Query(...),
+    horizon_hours: int = 24,
+    columnar: bool = False,
+) -> Dict[str, Any]:
+    """
+    Raw ML demand forecasts for several buildings in one call (dashboard refresh).
+    columnar=true sends each forecast_series as parallel arrays instead of per-hour objects.
+    """
+    cache_control = f"private, max-age={FORECAST_CACHE_TTL_SECONDS}"
+    response.headers["Cache-Control"] = cache_control
+    body = {
+        "status": "ok",
+        "horizon_hours": horizon_hours,
+        "forecasts": forecast_water_demand_batch(building_ids, horizon_hours, columnar=columnar),
+    }
+    if columnar:
+        # numpy columns go straight to orjson (skips jsonable_encoder)
+        return ORJSONResponse(body, headers={"Cache-Control": cache_control})
+    return body
+
+
 @router.post("/water/run", response_model=None)
 def run_water_supervisor(
     building_id: str,
@@ -1,21 +1,35 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
+from sqlalchemy import Row, func, select, tuple_
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
-import uuid
+import secrets
+import string
 
 from db.models import TaskDB
 
 
 def _utc_now():
-    return datetime.now(timezone.utc)
+    # Naive UTC: the form DateTime columns come back in from SQLite, so
+    # freshly created rows and re-read rows serialize the same way
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _title_key(title: str) -> str:
+    """Title as SQLite's built-in lower() folds it (ASCII letters only)."""
+    return title.translate(_ASCII_LOWER)
 
 
 def _make_id(prefix: str) -> str:
-    return f"{prefix}_{uuid.uuid4().hex[:8].upper()}"
+    return f"{prefix}_{secrets.token_hex(4).upper()}"
 
 
-def get_all_tasks(db: Session) -> List[TaskDB]:
-    return db.query(TaskDB).order_by(TaskDB.created_at.desc()).all()
+def get_all_tasks(db: Session) -> List[Row]:
+    """All tasks, newest first, as column Rows (attribute access like TaskDB)."""
+    stmt = select(*TaskDB.__table__.columns).order_by(TaskDB.created_at.desc())
+    return db.execute(stmt).all()
 
 
 def find_open_duplicate(
@@ -23,17 +37,20 @@ def find_open_duplicate(
     title: str,
     asset_id: str,
     building_id: str,
-) -> Optional[TaskDB]:
-    return (
-        db.query(TaskDB)
-        .filter(
-            TaskDB.status == "OPEN",
-            TaskDB.title.ilike(title),
-            TaskDB.asset_id == asset_id,
+) -> Optional[Row]:
+    """First OPEN task with this (case-insensitive) title, as a column Row."""
+    # Uses ix_tasks_dedupe; one row, no ORM instance hydrated.
+    stmt = (
+        select(*TaskDB.__table__.columns)
+        .where(
             TaskDB.building_id == building_id,
+            TaskDB.asset_id == asset_id,
+            TaskDB.status == "OPEN",
+            func.lower(TaskDB.title) == _title_key(title),
         )
-        .first()
+        .limit(1)
     )
+    return db.execute(stmt).first()
 
 
 def create_task(
@@ -46,7 +63,7 @@ def create_task(
     building_id: str,
     priority: str,
     sla_hours: int,
-) -> TaskDB:
+) -> Union[TaskDB, Row]:
     existing = find_open_duplicate(
         db=db,
         title=title,
@@ -77,3 +94,60 @@ def create_task(
     db.refresh(task)
 
     return task
+
+
+_TASK_INPUT_FIELDS = (
+    "title", "description", "asset_type", "asset_id", "building_id", "priority", "sla_hours",
+)
+
+
+def create_tasks_bulk(db: Session, task_dicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Insert many tasks with one duplicate lookup and one commit.
+
+    Each dict carries create_task()'s keyword fields. Returns one stored row
+    (as a dict) per input, in order; OPEN duplicates are returned as-is.
+    """
+    if not task_dicts:
+        return []
+
+    pairs = {(d["asset_id"], d["building_id"]) for d in task_dicts}
+    title_keys = {_title_key(d["title"]) for d in task_dicts}
+    title_key = func.lower(TaskDB.title)
+    stmt = select(*TaskDB.__table__.columns, title_key.label("title_key")).where(
+        TaskDB.status == "OPEN",
+        tuple_(TaskDB.asset_id, TaskDB.building_id).in_(pairs),
+        title_key.in_(title_keys),
+    )
+    # Same case-insensitive title match as find_open_duplicate (SQLite lower()).
+    seen = {}
+    for r in db.execute(stmt):
+        row = dict(r._mapping)
+        key = (row.pop("title_key"), row["asset_id"], row["building_id"])
+        seen.setdefault(key, row)
+
+    now = _utc_now()
+    new_rows: List[Dict[str, Any]] = []
+    out: List[Dict[str, Any]] = []
+    for d in task_dicts:
+        key = (_title_key(d["title"]), d["asset_id"], d["building_id"])
+        row = seen.get(key)
+        if row is None:
+            row = {f: d[f] for f in _TASK_INPUT_FIELDS}
+            row.update(
+                task_id=_make_id("TASK"),
+                status="OPEN",
+                created_at=now,
+                updated_at=now,
+                notes=None,
+            )
+            seen[key] = row
+            new_rows.append(row)
+        out.append(row)
+
+    if new_rows:
+        # IDs are generated client-side, so no refresh round-trip is needed.
+        db.bulk_insert_mappings(TaskDB, new_rows)
+        db.commit()
+
+    return out
@@ -1,13 +1,12 @@
-﻿from sqlalchemy import Column, String, Integer, DateTime, Text
-from sqlalchemy.ext.declarative import declarative_base
+﻿from sqlalchemy import Column, String, Integer, DateTime, Text, Index, func
 from datetime import datetime
 
-Base = declarative_base()
+# Shared with db.session so init_db() creates these tables.
+from db.session import Base
 
 
 class TaskDB(Base):
     __tablename__ = "tasks"
-
     task_id = Column(String, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
@@ -24,3 +23,10 @@ class TaskDB(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
     notes = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # Open-duplicate lookups: equality on every column, title compared lower-cased.
+        Index("ix_tasks_dedupe", building_id, asset_id, status, func.lower(title)),
+        # list_tasks: filter by building/status, newest first.
+        Index("ix_tasks_building_status_created", building_id, status, created_at.desc()),
+    )
@@ -28,3 +28,6 @@ def get_db():
 def init_db():
     from db import models
     Base.metadata.create_all(bind=engine)
+    # create_all skips indexes on tables that already exist.
+    for index in models.TaskDB.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
@@ -1,25 +1,68 @@
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import os
+import textwrap
 
-np.random.seed(42)
+try:
+    import pyarrow as pa  # optional, enables the Parquet copies
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+rng = np.random.default_rng(42)
 
 # Create output directory
 os.makedirs('data/samples', exist_ok=True)
 
 # Config
 START = datetime(2025, 10, 1)
+START_NS = np.datetime64(START, 'ns')
 DAYS = 14
 BUILDINGS = ['BLD_001', 'BLD_002']
+PUMP_STATUSES = ['running', 'warning', 'critical', 'failed']
+SENSOR_DTYPE = np.float32  # sensor readings are stored as contiguous float32 columns
+
+
+def day_hour(index):
+    """1-based day number and hour of day for a DatetimeIndex, as compact int arrays."""
+    day = ((index.values - START_NS) // np.timedelta64(1, 'D') + 1).astype(np.int8)
+    hour = index.hour.to_numpy().astype(np.int8)
+    return day, hour
+
+
+def repeat_categorical(values, n):
+    """Categorical column repeating each of `values` n times (stored as small int codes)."""
+    categories = list(dict.fromkeys(values))
+    codes = np.repeat([categories.index(v) for v in values], n)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def save_samples(df, name):
+    """
+    Write data/samples/<name>.csv (read by the services and models) and, when
+    pyarrow is installed, a columnar zstd Parquet copy.
+    """
+    df.to_csv(f'data/samples/{name}.csv', index=False)
+    if HAS_PYARROW:
+        # Columns are already typed (float32 readings, narrow ints, categorical ids),
+        # so Arrow takes them as-is; categoricals become dictionary arrays.
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, f'data/samples/{name}.parquet', compression='zstd')
+
 
 print("🚀 Starting REALISTIC data generation...")
 print(f"Time period: {DAYS} days starting {START.date()}")
 print(f"Buildings: {len(BUILDINGS)}")
 
+# Each file is written in the background while the next section is generated
+writer = ThreadPoolExecutor(max_workers=4)
+pending_writes = []
+
 # === 1. PUMP DATA WITH DIVERSE SCENARIOS ===
 print("\n📊 Generating pump data with realistic failure scenarios...")
-pump_rows = []
 timestamps = pd.date_range(START, periods=DAYS*48, freq='30min')
 
 # Define realistic scenarios for each pump
@@ -46,224 +89,200 @@ pump_scenarios = {
     },
 }
 
-for bld in BUILDINGS:
-    for pump_num in [1, 2]:
-        pump_id = f"PUMP_{bld}_{pump_num:02d}"
-        scenario = pump_scenarios.get(pump_id, {'type': 'healthy_normal', 'failure_day': None})
-        scenario_type = scenario['type']
-        failure_day = scenario.get('failure_day', None)
-        
-        print(f"   Generating {pump_id}: {scenario['description']}")
-        
-        for idx, ts in enumerate(timestamps):
-            day = (ts - START).days + 1
-            hour = ts.hour
-            
-            # === SCENARIO 1: GRADUAL BEARING FAILURE ===
-            if scenario_type == 'gradual_bearing_failure':
-                if day <= 5:
-                    # Normal operation
-                    vib = np.random.normal(3.5, 0.4)
-                    temp = np.random.normal(50, 2)
-                    current = np.random.normal(9.5, 0.5)
-                    status = 'running'
-                
-                elif day == 6:
-                    # Day 6: Slight increase (early warning)
-                    vib = np.random.normal(4.8, 0.5)
-                    temp = np.random.normal(54, 2)
-                    current = np.random.normal(10.0, 0.5)
-                    status = 'running'
-                
-                elif day == 7:
-                    # Day 7: More pronounced
-                    vib = np.random.normal(5.9, 0.6)
-                    temp = np.random.normal(58, 2.5)
-                    current = np.random.normal(10.5, 0.5)
-                    status = 'running'
-                
-                elif day == 8:
-                    # Day 8: Clear warning signs
-                    vib = np.random.normal(7.2, 0.7)
-                    temp = np.random.normal(63, 2)
-                    current = np.random.normal(11.0, 0.6)
-                    status = 'warning'
-                
-                elif day == 9:
-                    # Day 9: Severe degradation
-                    vib = np.random.normal(8.5, 0.8)
-                    temp = np.random.normal(67, 2.5)
-                    current = np.random.normal(11.5, 0.6)
-                    status = 'critical'
-                
-                elif day == 10:
-                    # Day 10: Very severe - about to fail
-                    vib = np.random.normal(9.5, 0.9)
-                    temp = np.random.normal(72, 3)
-                    current = np.random.normal(12.0, 0.7)
-                    status = 'critical'
-                
-                else:  # day >= 11
-                    # FAILED - pump stopped
-                    vib = 0
-                    temp = np.random.normal(25, 1)  # Ambient temp
-                    current = 0
-                    status = 'failed'
-            
-            # === SCENARIO 2: EARLY WARNING BUT RECOVERS ===
-            elif scenario_type == 'early_warning_normal':
-                if day <= 7:
-                    # Normal operation
-                    vib = np.random.normal(3.2, 0.3)
-                    temp = np.random.normal(49, 1.5)
-                    current = np.random.normal(9.2, 0.4)
-                    status = 'running'
-                
-                elif day == 8:
-                    # Day 8: Spike in vibration (loose bolt, debris, etc.)
-                    vib = np.random.normal(7.5, 0.8)
-                    temp = np.random.normal(65, 2)
-                    current = np.random.normal(10.8, 0.5)
-                    status = 'warning'
-                
-                elif day == 9:
-                    # Day 9: Maintenance performed - still elevated
-                    vib = np.random.normal(5.0, 0.5)
-                    temp = np.random.normal(56, 2)
-                    current = np.random.normal(9.8, 0.4)
-                    status = 'running'
-                
-                else:  # day >= 10
-                    # Back to normal after maintenance
-                    vib = np.random.normal(3.2, 0.3)
-                    temp = np.random.normal(49, 1.5)
-                    current = np.random.normal(9.2, 0.4)
-                    status = 'running'
-            
-            # === SCENARIO 3: SUDDEN SEAL FAILURE ===
-            elif scenario_type == 'sudden_seal_failure':
-                if day <= 10:
-                    # Normal operation
-                    vib = np.random.normal(3.8, 0.4)
-                    temp = np.random.normal(51, 2)
-                    current = np.random.normal(9.6, 0.5)
-                    status = 'running'
-                
-                elif day == 11:
-                    # Day 11: Brief warning - pressure drop
-                    vib = np.random.normal(5.5, 0.6)
-                    temp = np.random.normal(57, 2)
-                    current = np.random.normal(10.2, 0.5)
-                    status = 'running'
-                
-                elif day == 12 and hour < 14:
-                    # Day 12 morning: Still running but degraded
-                    vib = np.random.normal(6.8, 0.7)
-                    temp = np.random.normal(62, 2)
-                    current = np.random.normal(10.8, 0.6)
-                    status = 'warning'
-                
-                else:  # day 12 afternoon onwards
-                    # SUDDEN FAILURE - seal rupture
-                    vib = 0
-                    temp = np.random.normal(25, 1)
-                    current = 0
-                    status = 'failed'
-            
-            # === SCENARIO 4: HEALTHY NORMAL ===
-            else:  # healthy_normal
-                # Consistent healthy operation
-                # Add realistic daily patterns (slightly higher in afternoon)
-                hour_factor = 1.0 + 0.05 * np.sin((hour - 12) * np.pi / 12)
-                
-                vib = np.random.normal(3.0 * hour_factor, 0.3)
-                temp = np.random.normal(48 * hour_factor, 1.5)
-                current = np.random.normal(9.0 * hour_factor, 0.4)
-                status = 'running'
-            
-            # Calculate dependent variables
-            if status == 'failed':
-                flow_rate = 0
-                pressure = 0
-            else:
-                # Flow rate decreases as pump degrades
-                degradation_factor = 1.0 - (vib / 12.0) * 0.3  # Up to 30% reduction
-                flow_rate = np.random.normal(180 * degradation_factor, 15)
-                pressure = np.random.normal(45 * degradation_factor, 3)
-            
-            pump_rows.append({
-                'pump_id': pump_id,
-                'building_id': bld,
-                'tank_id': f"TANK_{bld}_{pump_num:02d}",
-                'timestamp': ts,
-                'status': status,
-                'current_amps': round(max(0, current), 2),
-                'vibration_mm_s': round(max(0, vib), 2),
-                'temperature_celsius': round(temp, 1),
-                'flow_rate_lpm': round(max(0, flow_rate), 1),
-                'pressure_psi': round(max(0, pressure), 1)
-            })
-
-df_pumps = pd.DataFrame(pump_rows)
-df_pumps.to_csv('data/samples/water_pumps.csv', index=False)
+# Per-scenario day ranges as
+# (last day, vib loc, vib scale, temp loc, temp scale, current loc, current scale, status)
+PUMP_SCENARIO_DAYS = {
+    # === SCENARIO 1: GRADUAL BEARING FAILURE ===
+    'gradual_bearing_failure': [
+        (5, 3.5, 0.4, 50, 2, 9.5, 0.5, 'running'),        # Normal operation
+        (6, 4.8, 0.5, 54, 2, 10.0, 0.5, 'running'),       # Slight increase (early warning)
+        (7, 5.9, 0.6, 58, 2.5, 10.5, 0.5, 'running'),     # More pronounced
+        (8, 7.2, 0.7, 63, 2, 11.0, 0.6, 'warning'),       # Clear warning signs
+        (9, 8.5, 0.8, 67, 2.5, 11.5, 0.6, 'critical'),    # Severe degradation
+        (10, 9.5, 0.9, 72, 3, 12.0, 0.7, 'critical'),     # Very severe - about to fail
+        (DAYS, 0, 0, 25, 1, 0, 0, 'failed'),              # FAILED - pump stopped, ambient temp
+    ],
+    # === SCENARIO 2: EARLY WARNING BUT RECOVERS ===
+    'early_warning_normal': [
+        (7, 3.2, 0.3, 49, 1.5, 9.2, 0.4, 'running'),      # Normal operation
+        (8, 7.5, 0.8, 65, 2, 10.8, 0.5, 'warning'),       # Spike (loose bolt, debris, etc.)
+        (9, 5.0, 0.5, 56, 2, 9.8, 0.4, 'running'),        # Maintenance performed - still elevated
+        (DAYS, 3.2, 0.3, 49, 1.5, 9.2, 0.4, 'running'),   # Back to normal after maintenance
+    ],
+    # === SCENARIO 3: SUDDEN SEAL FAILURE ===
+    'sudden_seal_failure': [
+        (10, 3.8, 0.4, 51, 2, 9.6, 0.5, 'running'),       # Normal operation
+        (11, 5.5, 0.6, 57, 2, 10.2, 0.5, 'running'),      # Brief warning - pressure drop
+        (DAYS, 0, 0, 25, 1, 0, 0, 'failed'),              # SUDDEN FAILURE - seal rupture (day 12 14:00)
+    ],
+    # === SCENARIO 4: HEALTHY NORMAL ===
+    'healthy_normal': [
+        (DAYS, 3.0, 0.3, 48, 1.5, 9.0, 0.4, 'running'),   # Consistent healthy operation
+    ],
+}
+
+# Sudden seal failure, day 12 before 14:00: still running but degraded
+SEAL_DAY12_MORNING = (6.8, 0.7, 62, 2, 10.8, 0.6, 'warning')
+
+# Healthy pump daily load factor, one entry per hour of day
+HOUR_FACTOR = 1.0 + 0.05 * np.sin((np.arange(24) - 12) * np.pi / 12)
+
+
+def day_tables(ranges):
+    """Expand (last day, ...) ranges into per-day parameter rows and status codes."""
+    repeats = np.diff([0] + [r[0] for r in ranges])
+    params = np.repeat(np.array([r[1:7] for r in ranges], dtype=float), repeats, axis=0)
+    status = np.repeat(np.array([PUMP_STATUSES.index(r[7]) for r in ranges], dtype=np.int8), repeats)
+    return params, status
+
+
+PUMP_DAY_TABLES = {name: day_tables(ranges) for name, ranges in PUMP_SCENARIO_DAYS.items()}
+
+
+def generate_pump(scenario_type, day, hour, pump_rng):
+    """
+    Status codes and raw (vib, temp, current, flow, pressure) arrays for one
+    pump's timeline. Pure given its own Generator, so pumps are independent.
+    """
+    day_idx = np.clip(day - 1, 0, DAYS - 1)
+    
+    # One gather from the per-day tables instead of a branch per timestamp
+    params_by_day, status_by_day = PUMP_DAY_TABLES[scenario_type]
+    params = params_by_day[day_idx]
+    status = status_by_day[day_idx]
+    if scenario_type == 'sudden_seal_failure':
+        morning = (day == 12) & (hour < 14)
+        params[morning] = SEAL_DAY12_MORNING[:6]
+        status[morning] = PUMP_STATUSES.index(SEAL_DAY12_MORNING[6])
+    elif scenario_type == 'healthy_normal':
+        # Realistic daily pattern (slightly higher in afternoon) on vib/temp/current locs
+        params[:, 0::2] *= HOUR_FACTOR[hour][:, None]
+    
+    vib = pump_rng.normal(params[:, 0], params[:, 1])
+    temp = pump_rng.normal(params[:, 2], params[:, 3])
+    current = pump_rng.normal(params[:, 4], params[:, 5])
+    
+    # Calculate dependent variables (failed pumps are zeroed by the caller)
+    # Flow rate decreases as pump degrades
+    degradation_factor = 1.0 - (vib / 12.0) * 0.3  # Up to 30% reduction
+    flow_rate = pump_rng.normal(180 * degradation_factor, 15)
+    pressure = pump_rng.normal(45 * degradation_factor, 3)
+    return status, vib, temp, current, flow_rate, pressure
+
+
+day, hour = day_hour(timestamps)
+pumps = [(bld, pump_num) for bld in BUILDINGS for pump_num in [1, 2]]
+pump_ids = [f"PUMP_{bld}_{pump_num:02d}" for bld, pump_num in pumps]
+# Independent child stream per pump, derived from the master seed
+pump_rngs = rng.spawn(len(pump_ids))
+n_ts = len(timestamps)
+
+# One preallocated array per column, filled one pump-sized slice at a time
+n_pump_rows = len(pumps) * n_ts
+pump_status = np.empty(n_pump_rows, dtype=np.int8)  # codes into PUMP_STATUSES
+pump_current = np.empty(n_pump_rows, dtype=SENSOR_DTYPE)
+pump_vib = np.empty(n_pump_rows, dtype=SENSOR_DTYPE)
+pump_temp = np.empty(n_pump_rows, dtype=SENSOR_DTYPE)
+pump_flow = np.empty(n_pump_rows, dtype=SENSOR_DTYPE)
+pump_pressure = np.empty(n_pump_rows, dtype=SENSOR_DTYPE)
+
+for i, pump_id in enumerate(pump_ids):
+    scenario = pump_scenarios.get(pump_id, {'type': 'healthy_normal', 'failure_day': None})
+    scenario_type = scenario['type']
+    rows = slice(i * n_ts, (i + 1) * n_ts)
+    
+    print(f"   Generating {pump_id}: {scenario['description']}")
+    
+    status, vib, temp, current, flow_rate, pressure = generate_pump(scenario_type, day, hour, pump_rngs[i])
+    
+    pump_status[rows] = status
+    pump_current[rows] = current
+    pump_vib[rows] = vib
+    pump_temp[rows] = temp
+    pump_flow[rows] = flow_rate
+    pump_pressure[rows] = pressure
+
+failed_mask = pump_status == PUMP_STATUSES.index('failed')
+pump_flow[failed_mask] = 0
+pump_pressure[failed_mask] = 0
+
+# Clamp and round each column in place, one vectorized pass per column
+for arr, decimals in ((pump_current, 2), (pump_vib, 2), (pump_flow, 1), (pump_pressure, 1)):
+    np.clip(arr, 0, None, out=arr)
+    np.round(arr, decimals, out=arr)
+np.round(pump_temp, 1, out=pump_temp)
+
+df_pumps = pd.DataFrame({
+    'pump_id': repeat_categorical(pump_ids, n_ts),
+    'building_id': repeat_categorical([bld for bld, _ in pumps], n_ts),
+    'tank_id': repeat_categorical([f"TANK_{bld}_{pump_num:02d}" for bld, pump_num in pumps], n_ts),
+    'timestamp': np.tile(timestamps.values, len(pumps)),
+    'status': pd.Categorical.from_codes(pump_status, categories=PUMP_STATUSES),
+    'current_amps': pump_current,
+    'vibration_mm_s': pump_vib,
+    'temperature_celsius': pump_temp,
+    'flow_rate_lpm': pump_flow,
+    'pressure_psi': pump_pressure
+})
+pending_writes.append(writer.submit(save_samples, df_pumps, 'water_pumps'))
 print(f"\n   ✅ water_pumps.csv: {len(df_pumps)} rows")
 print(f"   Status distribution:")
-for status, count in df_pumps['status'].value_counts().items():
-    print(f"      {status}: {count} ({count/len(df_pumps)*100:.1f}%)")
+status_counts = df_pumps['status'].value_counts()
+status_summary = status_counts.rename_axis(None).to_frame('rows').assign(pct=(status_counts / len(df_pumps) * 100).round(1))
+print(textwrap.indent(status_summary.to_string(), ' ' * 6))
 
 # === 2. TANK DATA WITH REALISTIC PATTERNS ===
 print("\n📊 Generating tank data with realistic consumption patterns...")
-tank_rows = []
 timestamps_hourly = pd.date_range(START, periods=DAYS*24, freq='1h')
+day, hour = day_hour(timestamps_hourly)
+tanks = [(bld, tank_num) for bld in BUILDINGS for tank_num in [1, 2]]
+tank_ids = [f"TANK_{bld}_{tank_num:02d}" for bld, tank_num in tanks]
+n_ts = len(timestamps_hourly)
+
+# Every tank shares the hourly timeline, so tile the per-hour arrays once
+day_all = np.tile(day, len(tanks))
+hour_all = np.tile(hour, len(tanks))
+tank_capacity = np.repeat(np.array([5000 if tank_num == 1 else 3000 for _, tank_num in tanks], dtype=np.int16), n_ts)
+
+# Realistic daily patterns: morning peak, evening peak, night (very low), daytime
+flow_masks = [(6 <= hour_all) & (hour_all <= 9), (18 <= hour_all) & (hour_all <= 21), hour_all <= 5]
+outlet_loc = np.select(flow_masks, [180, 160, 40], default=100)
+outlet_scale = np.select(flow_masks, [20, 18, 10], default=15)
+
+# Tank level varies based on consumption (low on day 9 due to pump failure)
+pump_failure = (np.repeat(tank_ids, n_ts) == 'TANK_BLD_001_01') & (day_all == 9)
+post_peak = np.isin(hour_all, [7, 8, 19, 20])
+level_masks = [pump_failure, post_peak]
+level_low = np.select(level_masks, [20, 65], default=75)
+level_high = np.select(level_masks, [30, 80], default=92)
+
+n_tank_rows = len(tanks) * n_ts
+tank_outlet = rng.normal(outlet_loc, outlet_scale).astype(SENSOR_DTYPE)
+tank_inlet = rng.normal(150, 15, n_tank_rows).astype(SENSOR_DTYPE)
+tank_level = rng.uniform(level_low, level_high).astype(SENSOR_DTYPE)
+
+# Level in liters uses the unrounded percentage, so compute it before rounding in place
+tank_level_liters = np.round(tank_capacity * tank_level / 100).astype(np.int16)
+np.round(tank_level, 1, out=tank_level)
+for arr in (tank_inlet, tank_outlet):
+    np.clip(arr, 0, None, out=arr)
+    np.round(arr, 1, out=arr)
 
-for bld in BUILDINGS:
-    for tank_num in [1, 2]:
-        tank_id = f"TANK_{bld}_{tank_num:02d}"
-        capacity = 5000 if tank_num == 1 else 3000
-        
-        for ts in timestamps_hourly:
-            day = (ts - START).days + 1
-            hour = ts.hour
-            
-            # Realistic daily patterns
-            if 6 <= hour <= 9:  # Morning peak
-                outlet_flow = np.random.normal(180, 20)
-            elif 18 <= hour <= 21:  # Evening peak
-                outlet_flow = np.random.normal(160, 18)
-            elif 0 <= hour <= 5:  # Night - very low
-                outlet_flow = np.random.normal(40, 10)
-            else:  # Daytime
-                outlet_flow = np.random.normal(100, 15)
-            
-            inlet_flow = np.random.normal(150, 15)
-            
-            # Tank level varies based on consumption
-            if tank_id == 'TANK_BLD_001_01' and day == 9:
-                # Low level due to pump failure
-                level_pct = np.random.uniform(20, 30)
-            elif hour in [7, 8, 19, 20]:  # Post-peak hours
-                level_pct = np.random.uniform(65, 80)
-            else:
-                level_pct = np.random.uniform(75, 92)
-            
-            tank_rows.append({
-                'tank_id': tank_id,
-                'building_id': bld,
-                'timestamp': ts,
-                'capacity_liters': capacity,
-                'current_level_liters': round(capacity * level_pct / 100),
-                'level_percentage': round(level_pct, 1),
-                'inlet_flow_rate_lpm': round(max(0, inlet_flow), 1),
-                'outlet_flow_rate_lpm': round(max(0, outlet_flow), 1)
-            })
-
-df_tanks = pd.DataFrame(tank_rows)
-df_tanks.to_csv('data/samples/water_tanks.csv', index=False)
+df_tanks = pd.DataFrame({
+    'tank_id': repeat_categorical(tank_ids, n_ts),
+    'building_id': repeat_categorical([bld for bld, _ in tanks], n_ts),
+    'timestamp': np.tile(timestamps_hourly.values, len(tanks)),
+    'capacity_liters': tank_capacity,
+    'current_level_liters': tank_level_liters,
+    'level_percentage': tank_level,
+    'inlet_flow_rate_lpm': tank_inlet,
+    'outlet_flow_rate_lpm': tank_outlet
+})
+pending_writes.append(writer.submit(save_samples, df_tanks, 'water_tanks'))
 print(f"   ✅ water_tanks.csv: {len(df_tanks)} rows")
 
 # === 3. CONSUMPTION DATA WITH DIVERSE PATTERNS ===
 print("\n📊 Generating consumption data with diverse usage patterns...")
-cons_rows = []
 timestamps_4hr = pd.date_range(START, periods=DAYS*6, freq='4h')
 
 # Define unit behaviors
@@ -275,58 +294,58 @@ unit_patterns = {
     105: 'variable',           # Irregular patterns (maybe Airbnb)
 }
 
-for bld in BUILDINGS:
-    for unit_num in range(101, 106):
-        unit_id = f"UNIT_{bld}_{unit_num}"
-        pattern = unit_patterns[unit_num]
-        
-        for ts in timestamps_4hr:
-            day = (ts - START).days + 1
-            hour = ts.hour
-            
-            # Base consumption by time of day
-            if 6 <= hour <= 9 or 18 <= hour <= 21:
-                base = 50
-            elif 0 <= hour <= 5:
-                base = 8
-            else:
-                base = 20
-            
-            # Apply pattern-specific modifications
-            if pattern == 'normal_family':
-                consumption = np.random.normal(base, base * 0.2)
-            
-            elif pattern == 'leak':
-                # High consumption consistently (leak days 7-10)
-                if 7 <= day <= 10:
-                    consumption = np.random.normal(base + 70, 15)
-                else:
-                    consumption = np.random.normal(base, base * 0.2)
-            
-            elif pattern == 'low_usage':
-                consumption = np.random.normal(base * 0.4, base * 0.1)
-            
-            elif pattern == 'high_usage':
-                consumption = np.random.normal(base * 1.8, base * 0.3)
-            
-            elif pattern == 'variable':
-                # Random spikes (guests coming/going)
-                if np.random.random() < 0.3:
-                    consumption = np.random.normal(base * 2.5, base * 0.4)
-                else:
-                    consumption = np.random.normal(base * 0.5, base * 0.15)
-            
-            cons_rows.append({
-                'timestamp': ts,
-                'building_id': bld,
-                'unit_id': unit_id,
-                'tank_id': f"TANK_{bld}_02",
-                'consumption_liters': round(max(0, consumption), 1),
-                'flow_rate_lpm': round(max(0, consumption) / 4, 2)
-            })
-
-df_cons = pd.DataFrame(cons_rows)
-df_cons.to_csv('data/samples/water_consumption.csv', index=False)
+day, hour = day_hour(timestamps_4hr)
+units = [(bld, unit_num) for bld in BUILDINGS for unit_num in range(101, 106)]
+unit_ids = [f"UNIT_{bld}_{unit_num}" for bld, unit_num in units]
+n_ts = len(timestamps_4hr)
+
+n_cons_rows = len(units) * n_ts
+consumption_arr = np.empty(n_cons_rows, dtype=SENSOR_DTYPE)
+
+# Base consumption by time of day
+peak = ((6 <= hour) & (hour <= 9)) | ((18 <= hour) & (hour <= 21))
+base = np.select([peak, hour <= 5], [50, 8], default=20)
+
+for i, (bld, unit_num) in enumerate(units):
+    pattern = unit_patterns[unit_num]
+    rows = slice(i * n_ts, (i + 1) * n_ts)
+    
+    # Apply pattern-specific modifications
+    if pattern == 'normal_family':
+        loc, scale = base, base * 0.2
+    
+    elif pattern == 'leak':
+        # High consumption consistently (leak days 7-10)
+        leaking = (7 <= day) & (day <= 10)
+        loc = np.where(leaking, base + 70, base)
+        scale = np.where(leaking, 15, base * 0.2)
+    
+    elif pattern == 'low_usage':
+        loc, scale = base * 0.4, base * 0.1
+    
+    elif pattern == 'high_usage':
+        loc, scale = base * 1.8, base * 0.3
+    
+    elif pattern == 'variable':
+        # Random spikes (guests coming/going)
+        spike = rng.random(n_ts) < 0.3
+        loc = np.where(spike, base * 2.5, base * 0.5)
+        scale = np.where(spike, base * 0.4, base * 0.15)
+    
+    consumption_arr[rows] = rng.normal(loc, scale)
+
+np.clip(consumption_arr, 0, None, out=consumption_arr)
+cons_flow = np.round(consumption_arr / 4, 2)
+np.round(consumption_arr, 1, out=consumption_arr)
+df_cons = pd.DataFrame({
+    'timestamp': np.tile(timestamps_4hr.values, len(units)),
+    'building_id': repeat_categorical([bld for bld, _ in units], n_ts),
+    'unit_id': repeat_categorical(unit_ids, n_ts),
+    'tank_id': repeat_categorical([f"TANK_{bld}_02" for bld, _ in units], n_ts),
+    'consumption_liters': consumption_arr,
+    'flow_rate_lpm': cons_flow
+})
+pending_writes.append(writer.submit(save_samples, df_cons, 'water_consumption'))
 print(f"   ✅ water_consumption.csv: {len(df_cons)} rows")
 
 # === 4. ALERTS - COMPREHENSIVE ===
@@ -399,9 +418,14 @@ alerts = [
 ]
 
 df_alerts = pd.DataFrame(alerts)
-df_alerts.to_csv('data/samples/alerts.csv', index=False)
+pending_writes.append(writer.submit(df_alerts.to_csv, 'data/samples/alerts.csv', index=False))
 print(f"   ✅ alerts.csv: {len(df_alerts)} events")
 
+# Wait for the background writes (re-raises any write error)
+for write in pending_writes:
+    write.result()
+writer.shutdown()
+
 # === SUMMARY ===
 print("\n" + "="*60)
 print("🎉 REALISTIC DATA GENERATION COMPLETE!")
@@ -413,6 +437,8 @@ print(f"  1. water_pumps.csv ({len(df_pumps):,} rows)")
 print(f"  2. water_tanks.csv ({len(df_tanks):,} rows)")
 print(f"  3. water_consumption.csv ({len(df_cons):,} rows)")
 print(f"  4. alerts.csv ({len(df_alerts)} rows)")
+if HAS_PYARROW:
+    print(f"  + water_*.parquet copies (zstd)")
 
 print("\n📊 Pump Scenarios Summary:")
 for pump_id, scenario in pump_scenarios.items():
@@ -4,14 +4,22 @@ Consumes IoT sensor data from MQTT broker and triggers agents
 """
 import json
 import logging
+import operator
+import queue
+import struct
+import threading
 from datetime import datetime
 from typing import Callable, Optional
 import sys
 import os
 
+import numpy as np
+import orjson
+
 # Add parent directory to path
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, parent_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -24,10 +32,203 @@ except ImportError:
     logger.warning("paho-mqtt not installed. Run: pip install paho-mqtt")
     MQTT_AVAILABLE = False
 
+try:
+    import simdjson
+    # One reusable parser per worker thread: keeps its buffers between messages
+    _PARSERS = threading.local()
+    SIMDJSON_AVAILABLE = True
+except ImportError:
+    SIMDJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# Log records (JSONL, binary or msgpack) are buffered and appended in
+# batches of this size, or after this many seconds, whichever comes first
+JSONL_FLUSH_BATCH = 64
+JSONL_FLUSH_INTERVAL_SECONDS = 0.5
+
+# sensor_type -> (compare, threshold, alert severity, log level, log message)
+ALERT_THRESHOLDS = {
+    "vibration": (operator.gt, 8.0, "CRITICAL", logging.CRITICAL,
+                  "🚨 CRITICAL: High vibration on {asset_id}: {value}"),
+    "temperature": (operator.gt, 85, "CRITICAL", logging.CRITICAL,
+                    "🚨 CRITICAL: High temperature on {asset_id}: {value}°C"),
+    "water_level": (operator.lt, 10, "HIGH", logging.WARNING,
+                    "⚠️ WARNING: Low water level on {asset_id}: {value}%"),
+}
+
+# Append-only log flags: O_APPEND keeps each batch write atomic across writers
+_APPEND_OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_CLOEXEC", 0)
+
+# Written log pages are never re-read by the consumer, so drop them from the
+# page cache once a file is rotated out or closed (one call per file, not per batch)
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+
+# Per-message receipt is logged as a running count every N messages
+MESSAGE_LOG_EVERY = 1000
+
+# Threads draining the message queues (parsing, alerts, file I/O); each topic
+# is pinned to one worker, so a topic's messages keep their arrival order
+MQTT_WORKER_THREADS = min(4, os.cpu_count() or 1)
+
+# One wildcard subscription; messages are routed on the second topic level
+DEFAULT_TOPICS = ["homenet/#"]
+TOPIC_ROOT = "homenet"
+TOPIC_CATEGORIES = ("sensors", "pumps", "tanks", "alerts")
+
+# Sensor log format: "jsonl" keeps the full record, "binary" packs fixed-size
+# (asset_id, sensor_type, value, unix timestamp) records for compact storage
+SENSOR_LOG_FORMAT = os.getenv("HOMENET_SENSOR_LOG_FORMAT", "jsonl")
+
+# Binary sensor record: ids are NUL-padded/truncated to 16 bytes
+SENSOR_RECORD = struct.Struct("<16s16sdd")
+SENSOR_RECORD_DTYPE = np.dtype([
+    ("asset_id", "S16"), ("sensor_type", "S16"), ("value", "<f8"), ("timestamp", "<f8"),
+])
+
+# Queue item telling a worker to exit
+_STOP = object()
+
+
+def _jsonl_line(record: dict) -> bytes:
+    return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def _reading_epoch(data: dict) -> float:
+    """Unix time of a reading: its own timestamp if parseable, else received_at."""
+    for key in ("timestamp", "received_at"):
+        ts = data.get(key)
+        if isinstance(ts, (int, float)):
+            return float(ts)
+        try:
+            return datetime.fromisoformat(ts).timestamp()
+        except (TypeError, ValueError):
+            continue
+    return datetime.now().timestamp()
+
+
+def _pack_sensor_record(data: dict) -> bytes:
+    # struct's "16s" pads with NUL and truncates longer ids
+    return SENSOR_RECORD.pack(
+        str(data.get("asset_id", "")).encode(),
+        str(data.get("sensor_type", "")).encode(),
+        data.get("value", 0.0),
+        _reading_epoch(data),
+    )
+
+
+def read_sensor_log(path: str) -> np.ndarray:
+    """Load a binary sensor log as a structured array (SENSOR_RECORD_DTYPE)."""
+    return np.fromfile(path, dtype=SENSOR_RECORD_DTYPE)
+
+
+class _BatchedAppendWriter:
+    """
+    Buffers records as `encode`d bytes (JSONL lines by default, packed
+    binary or msgpack for the other sinks) and appends them through one
+    long-lived file handle, reopened only when `path_for_now()` changes
+    (e.g. daily rotation).
+    """
+    
+    def __init__(self, path_for_now: Callable[[], str],
+                 batch_size: int = JSONL_FLUSH_BATCH,
+                 interval: float = JSONL_FLUSH_INTERVAL_SECONDS,
+                 encode: Optional[Callable[[dict], bytes]] = None):
+        self._path_for_now = path_for_now
+        self._encode = encode or _jsonl_line
+        self.batch_size = batch_size
+        self.interval = interval
+        self._buffer: list[bytes] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._fh = None
+        self._path = None
+    
+    def append(self, record: dict) -> str:
+        """Queue one record; returns the file it will be written to."""
+        line = self._encode(record)
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.interval, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return self._path or self._path_for_now()
+    
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+    
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._fh:
+                self._release_fh()
+                self._path = None
+    
+    def _timed_flush(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"❌ Error flushing {self._path}: {e}")
+    
+    def _release_fh(self):
+        self._drop_cached_pages()
+        self._fh.close()
+        self._fh = None
+    
+    def _drop_cached_pages(self):
+        if HAS_FADVISE:
+            os.posix_fadvise(self._fh.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        
+        path = self._path_for_now()
+        if path != self._path:
+            if self._fh:
+                self._release_fh()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd = os.open(path, _APPEND_OPEN_FLAGS, 0o644)
+            self._fh = os.fdopen(fd, "ab", buffering=1 << 16)
+            self._path = path
+        
+        self._fh.writelines(self._buffer)
+        self._fh.flush()
+        self._buffer.clear()
+
+
+def _sensor_log_path() -> str:
+    return f"data/realtime/sensors_{datetime.now().strftime('%Y%m%d')}.jsonl"
+
+
+def _trace_log_path() -> str:
+    return f"data/realtime/trace_{datetime.now().strftime('%Y%m%d')}.msgpack"
+
+
+def _binary_sensor_log_path() -> str:
+    return f"data/realtime/sensors_{datetime.now().strftime('%Y%m%d')}.bin"
+
 
 class MQTTSensorConsumer:
     """
     MQTT Consumer for HOMENET sensor data
+
+    Messages are processed by MQTT_WORKER_THREADS workers started in start().
+    Each topic hashes to one worker, so per-topic (per-sensor) order is kept,
+    but records from different topics can reach the shared sensor/alert logs
+    in a different order than they arrived; use MQTT_WORKER_THREADS = 1 for
+    strict arrival order across topics.
     """
     
     def __init__(self, 
@@ -35,7 +236,9 @@ class MQTTSensorConsumer:
                  port: int = 1883,
                  username: Optional[str] = None,
                  password: Optional[str] = None,
-                 callback: Optional[Callable] = None):
+                 callback: Optional[Callable] = None,
+                 share_group: Optional[str] = None,
+                 sensor_log_format: str = SENSOR_LOG_FORMAT):
         """
         Initialize MQTT consumer
         
@@ -45,14 +248,38 @@ class MQTTSensorConsumer:
             username: Optional authentication username
             password: Optional authentication password
             callback: Optional function to call when message received
+                (runs on a worker thread)
+            share_group: Optional shared-subscription group ($share/<group>/...)
+                so several consumers split one topic's messages
+            sensor_log_format: "jsonl" (full records) or "binary"
+                (SENSOR_RECORD structs, see read_sensor_log)
         """
         self.broker_url = broker_url
         self.port = port
         self.username = username
         self.password = password
         self.callback = callback
+        self.share_group = share_group
         self.client = None
         self.connected = False
+        self._msg_count = 0
+        
+        # Batched sinks (sensor log rotates daily; alerts always stay JSONL)
+        if sensor_log_format == "binary":
+            self._sensor_writer = _BatchedAppendWriter(_binary_sensor_log_path,
+                                                       encode=_pack_sensor_record)
+        else:
+            self._sensor_writer = _BatchedAppendWriter(_sensor_log_path)
+        self._alert_writer = _BatchedAppendWriter(lambda: "data/alerts/critical_alerts.jsonl")
+        # DEBUG traces as a msgpack stream instead of formatted log lines (opened on first use)
+        self._trace_writer = (
+            _BatchedAppendWriter(_trace_log_path, encode=msgpack.packb) if MSGPACK_AVAILABLE else None
+        )
+        
+        # paho's network thread only enqueues; workers (started in start()) process
+        self._queues = [queue.SimpleQueue() for _ in range(MQTT_WORKER_THREADS)]
+        self._stopped = threading.Event()
+        self._workers: list[threading.Thread] = []
         
         if not MQTT_AVAILABLE:
             logger.error("MQTT not available - install paho-mqtt")
@@ -85,14 +312,37 @@ class MQTTSensorConsumer:
             logger.warning(f"⚠️ Unexpected disconnection. Code: {rc}")
     
     def _on_message(self, client, userdata, msg):
-        """Callback when message received"""
+        """Callback when message received (network thread: enqueue only)"""
+        if not self._is_routed(msg.topic):
+            return
+        
+        # Raw bytes: the JSON parser validates UTF-8 itself
+        self._queues[hash(msg.topic) % len(self._queues)].put((msg.payload, msg.topic))
+        
+        self._msg_count += 1
+        if self._msg_count % MESSAGE_LOG_EVERY == 0:
+            logger.info(f"📨 Received {self._msg_count} messages (latest topic: {msg.topic})")
+    
+    @staticmethod
+    def _is_routed(topic: str) -> bool:
+        """False for homenet/<category> topics outside TOPIC_CATEGORIES"""
+        parts = topic.split("/", 2)
+        if parts[0] != TOPIC_ROOT:
+            # Explicitly subscribed non-HOMENET topic
+            return True
+        return len(parts) > 1 and parts[1] in TOPIC_CATEGORIES
+    
+    def _worker(self, messages: queue.SimpleQueue):
+        """Drain one message queue until a stop marker arrives"""
+        while True:
+            item = messages.get()
+            if item is _STOP:
+                return
+            self._process(*item)
+    
+    def _process(self, payload, topic: str):
+        """Parse, store and alert on one message"""
         try:
-            # Parse message
-            payload = msg.payload.decode('utf-8')
-            topic = msg.topic
-            
-            logger.info(f"📨 Received message on topic: {topic}")
-            
             # Parse JSON payload
             data = parse_mqtt_message(payload)
             
@@ -100,12 +350,17 @@ class MQTTSensorConsumer:
                 logger.warning(f"⚠️ Failed to parse message: {payload}")
                 return
             
-            # Add metadata
-            data['received_at'] = datetime.now().isoformat()
+            # Add metadata (one clock read per message, reused for alerts)
+            now = datetime.now()
+            data['received_at'] = now.isoformat()
             data['topic'] = topic
             
-            # Log parsed data
-            logger.info(f"📊 Parsed data: {json.dumps(data, indent=2)}")
+            # Trace parsed data (only when DEBUG is enabled)
+            if logger.isEnabledFor(logging.DEBUG):
+                if self._trace_writer:
+                    self._trace_writer.append(data)
+                else:
+                    logger.debug("📊 Parsed data: %s", data)
             
             # Call custom callback if provided
             if self.callback:
@@ -115,7 +370,7 @@ class MQTTSensorConsumer:
             self._store_data(data)
             
             # Check for critical alerts and trigger agents
-            self._check_critical_alerts(data)
+            self._check_critical_alerts(data, now)
             
         except Exception as e:
             logger.error(f"❌ Error processing message: {e}")
@@ -123,53 +378,44 @@ class MQTTSensorConsumer:
     def _store_data(self, data: dict):
         """Store sensor data to file (POC placeholder)"""
         try:
-            # Create data directory if not exists
-            os.makedirs("data/realtime", exist_ok=True)
-            
-            # Append to daily log file
-            date_str = datetime.now().strftime("%Y%m%d")
-            filename = f"data/realtime/sensors_{date_str}.jsonl"
+            # Buffered append to the daily log file
+            filename = self._sensor_writer.append(data)
             
-            with open(filename, "a") as f:
-                f.write(json.dumps(data) + "\n")
-            
-            logger.debug(f"💾 Data stored to: {filename}")
+            logger.debug(f"💾 Data queued for: {filename}")
             
         except Exception as e:
             logger.error(f"❌ Error storing data: {e}")
     
-    def _check_critical_alerts(self, data: dict):
+    def _check_critical_alerts(self, data: dict, now: Optional[datetime] = None):
         """Check if data triggers critical alerts"""
         try:
             sensor_type = data.get("sensor_type", "")
             value = data.get("value", 0)
             asset_id = data.get("asset_id", "")
             
-            # Critical thresholds
-            if sensor_type == "vibration" and value > 8.0:
-                logger.critical(f"🚨 CRITICAL: High vibration on {asset_id}: {value}")
-                self._trigger_agent_alert(asset_id, "vibration", "CRITICAL", value)
-                
-            elif sensor_type == "temperature" and value > 85:
-                logger.critical(f"🚨 CRITICAL: High temperature on {asset_id}: {value}°C")
-                self._trigger_agent_alert(asset_id, "temperature", "CRITICAL", value)
-                
-            elif sensor_type == "water_level" and value < 10:
-                logger.warning(f"⚠️ WARNING: Low water level on {asset_id}: {value}%")
-                self._trigger_agent_alert(asset_id, "water_level", "HIGH", value)
+            # Critical thresholds: one dict lookup per message
+            rule = ALERT_THRESHOLDS.get(sensor_type)
+            if rule is None:
+                return
+            compare, threshold, severity, log_level, message = rule
+            if compare(value, threshold):
+                logger.log(log_level, message.format(asset_id=asset_id, value=value))
+                self._trigger_agent_alert(asset_id, sensor_type, severity, value, now=now)
                 
         except Exception as e:
             logger.error(f"❌ Error checking alerts: {e}")
     
-    def _trigger_agent_alert(self, asset_id: str, alert_type: str, severity: str, value: float):
+    def _trigger_agent_alert(self, asset_id: str, alert_type: str, severity: str, value: float,
+                             now: Optional[datetime] = None):
         """Trigger agent workflow on critical alert"""
         try:
             logger.info(f"🤖 Triggering agents for {asset_id} - {alert_type} alert")
             
             # In production, this would call the LangGraph workflow
             # For now, just log the alert
+            # orjson writes the datetime in the same ISO format as .isoformat()
             alert = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now or datetime.now(),
                 "asset_id": asset_id,
                 "alert_type": alert_type,
                 "severity": severity,
@@ -177,10 +423,8 @@ class MQTTSensorConsumer:
                 "triggered_agents": True
             }
             
-            # Store alert
-            os.makedirs("data/alerts", exist_ok=True)
-            with open("data/alerts/critical_alerts.jsonl", "a") as f:
-                f.write(json.dumps(alert) + "\n")
+            # Store alert (buffered)
+            self._alert_writer.append(alert)
             
         except Exception as e:
             logger.error(f"❌ Error triggering agents: {e}")
@@ -205,6 +449,9 @@ class MQTTSensorConsumer:
             logger.error("❌ Not connected to broker")
             return False
         
+        if self.share_group:
+            topic = f"$share/{self.share_group}/{topic}"
+        
         try:
             self.client.subscribe(topic)
             logger.info(f"📡 Subscribed to topic: {topic}")
@@ -227,51 +474,101 @@ class MQTTSensorConsumer:
         for topic in topics:
             self.subscribe(topic)
         
-        # Start listening loop
+        self._start_workers()
+        
+        # Network loop runs in paho's own thread; block here until stop()
         logger.info("🎧 Starting MQTT consumer loop...")
+        self.client.loop_start()
         try:
-            self.client.loop_forever()
+            self._stopped.wait()
         except KeyboardInterrupt:
             logger.info("⏹️ Stopping consumer...")
             self.stop()
     
+    def _start_workers(self):
+        """One daemon worker per queue (no-op once running)"""
+        if self._workers:
+            return
+        self._workers = [
+            threading.Thread(target=self._worker, args=(messages,), name=f"mqtt-worker-{i}", daemon=True)
+            for i, messages in enumerate(self._queues)
+        ]
+        for worker in self._workers:
+            worker.start()
+    
     def stop(self):
         """Stop consumer and disconnect"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
         if self.client:
+            self.client.loop_stop()
             self.client.disconnect()
+        
+        # Let workers finish what is already queued, then write out the buffers
+        for messages in self._queues[:len(self._workers)]:
+            messages.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        self._sensor_writer.close()
+        self._alert_writer.close()
+        if self._trace_writer:
+            self._trace_writer.close()
+        if self.client:
             logger.info("✅ Consumer stopped")
 
 
-def parse_mqtt_message(payload: str) -> dict:
+def _parse_json(payload):
+    """Parse with simdjson when installed (lazy object), else orjson."""
+    if SIMDJSON_AVAILABLE:
+        parser = getattr(_PARSERS, "parser", None)
+        if parser is None:
+            parser = _PARSERS.parser = simdjson.Parser()
+        try:
+            return parser.parse(payload)
+        except ValueError:
+            pass
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return orjson.loads(payload)
+
+
+def parse_mqtt_message(payload) -> dict:
     """
     Convert MQTT payload into structured sensor record
     
     Args:
-        payload: JSON string from MQTT message
+        payload: JSON bytes or string from MQTT message
         
     Returns:
         Parsed sensor data dictionary
     """
     try:
         # Parse JSON
-        data = json.loads(payload)
+        data = _parse_json(payload)
         
-        # Validate required fields
-        required_fields = ["asset_id", "sensor_type", "value", "timestamp"]
-        if not all(field in data for field in required_fields):
+        # Validate required fields (one lookup each doubles as the presence check)
+        try:
+            asset_id = data["asset_id"]
+            sensor_type = data["sensor_type"]
+            value = data["value"]
+            timestamp = data["timestamp"]
+        except (KeyError, TypeError, IndexError):
             logger.warning(f"⚠️ Missing required fields in message")
             return {}
         
-        # Return structured data
+        get = data.get
+        metadata = get("metadata", {})
+        
+        # Return structured data (copied out, simdjson objects die on the next parse)
         return {
-            "asset_id": data.get("asset_id"),
-            "sensor_type": data.get("sensor_type"),
-            "value": float(data.get("value", 0)),
-            "timestamp": data.get("timestamp"),
-            "unit": data.get("unit", ""),
-            "building_id": data.get("building_id", ""),
-            "site_id": data.get("site_id", "SITE_001"),
-            "metadata": data.get("metadata", {})
+            "asset_id": asset_id,
+            "sensor_type": sensor_type,
+            "value": float(value),
+            "timestamp": timestamp,
+            "unit": get("unit", ""),
+            "building_id": get("building_id", ""),
+            "site_id": get("site_id", "SITE_001"),
+            "metadata": metadata.as_dict() if hasattr(metadata, "as_dict") else metadata
         }
         
     except json.JSONDecodeError as e:
@@ -285,7 +582,8 @@ def parse_mqtt_message(payload: str) -> dict:
 def start_mqtt_consumer(broker_url: str = "localhost",
                        port: int = 1883,
                        topics: list[str] = None,
-                       callback: Optional[Callable] = None) -> None:
+                       callback: Optional[Callable] = None,
+                       share_group: Optional[str] = None) -> None:
     """
     Start MQTT consumer with specified configuration
     
@@ -293,20 +591,18 @@ def start_mqtt_consumer(broker_url: str = "localhost",
         broker_url: MQTT broker address
         port: MQTT broker port  
         topics: List of topics to subscribe to
+            (default: homenet/# routed to sensors/pumps/tanks/alerts)
         callback: Optional callback function for messages
+        share_group: Optional shared-subscription group for scaling out consumers
     """
     if topics is None:
-        topics = [
-            "homenet/sensors/#",  # All sensors
-            "homenet/pumps/#",    # All pump data
-            "homenet/tanks/#",    # All tank data
-            "homenet/alerts/#"    # All alerts
-        ]
+        topics = DEFAULT_TOPICS
     
     consumer = MQTTSensorConsumer(
         broker_url=broker_url,
         port=port,
-        callback=callback
+        callback=callback,
+        share_group=share_group
     )
     
     consumer.start(topics)
@@ -321,7 +617,7 @@ if __name__ == "__main__":
     # Example usage
     print("\n📋 Configuration:")
     print("  Broker: localhost:1883")
-    print("  Topics: homenet/sensors/#, homenet/pumps/#")
+    print(f"  Topics: {', '.join(DEFAULT_TOPICS)} ({', '.join(TOPIC_CATEGORIES)})")
     
     print("\n⚠️ Make sure MQTT broker is running!")
     print("  Install: pip install paho-mqtt")
@@ -332,7 +628,7 @@ if __name__ == "__main__":
         start_mqtt_consumer(
             broker_url="localhost",
             port=1883,
-            topics=["homenet/#"]
+            topics=DEFAULT_TOPICS
         )
     except KeyboardInterrupt:
         print("\n✅ Consumer stopped by user")
@@ -1,4 +1,57 @@
-﻿def ingest_ticket(ticket: dict) -> dict:
+﻿import os
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+import orjson
+
+# Category mapping (earlier keywords win when several match)
+CATEGORY_KEYWORDS = (
+    ("no water", "water_supply"),
+    ("low pressure", "water_pressure"),
+    ("pump noise", "pump_failure"),
+    ("pump not working", "pump_failure"),
+    ("leakage", "water_leak"),
+    ("overflow", "tank_overflow"),
+    ("dirty water", "water_quality"),
+    ("motor", "pump_failure"),
+    ("vibration", "pump_vibration"),
+)
+
+# Priority mapping
+PRIORITY_MAP = {"urgent": "CRITICAL", "high": "HIGH", "medium": "MEDIUM", "low": "LOW"}
+
+try:
+    import ahocorasick
+    # One pass over the description finds every keyword (overlaps included)
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _rank, (_keyword, _cat) in enumerate(CATEGORY_KEYWORDS):
+        _KEYWORD_AUTOMATON.add_word(_keyword, (_rank, _cat))
+    _KEYWORD_AUTOMATON.make_automaton()
+except ImportError:
+    _KEYWORD_AUTOMATON = None
+
+
+def categorize_description(description: str) -> str:
+    """Category of the highest-ranked keyword found in a lowercased description."""
+    if _KEYWORD_AUTOMATON is not None:
+        matches = [value for _, value in _KEYWORD_AUTOMATON.iter(description)]
+        return min(matches)[1] if matches else "general_maintenance"
+    
+    for keyword, cat in CATEGORY_KEYWORDS:
+        if keyword in description:
+            return cat
+    return "general_maintenance"
+
+
+@lru_cache(maxsize=8)
+def _ingest_output_file(date_str: str) -> str:
+    """Daily JSONL path; the directory is created once per day, not per ticket."""
+    os.makedirs("data/tickets", exist_ok=True)
+    return f"data/tickets/ingested_{date_str}.jsonl"
+
+
+def ingest_ticket(ticket: dict) -> dict:
     """
     Ingest complaint/service ticket into DB (POC placeholder).
     Processes ticket and categorizes it for agent routing.
@@ -9,55 +62,31 @@
     Returns:
         Processed ticket with status
     """
-    import os
-    import json
-    from datetime import datetime
-    
-    # Category mapping
-    category_map = {
-        "no water": "water_supply",
-        "low pressure": "water_pressure",
-        "pump noise": "pump_failure",
-        "pump not working": "pump_failure",
-        "leakage": "water_leak",
-        "overflow": "tank_overflow",
-        "dirty water": "water_quality",
-        "motor": "pump_failure",
-        "vibration": "pump_vibration"
-    }
+    now = datetime.now()
     
     # Auto-categorize based on description
-    description = ticket.get("description", "").lower()
-    category = "general_maintenance"
-    
-    for keyword, cat in category_map.items():
-        if keyword in description:
-            category = cat
-            break
+    category = categorize_description(ticket.get("description", "").lower())
     
-    # Priority mapping
-    priority_map = {"urgent": "CRITICAL", "high": "HIGH", "medium": "MEDIUM", "low": "LOW"}
-    priority = priority_map.get(ticket.get("priority", "medium").lower(), "MEDIUM")
+    priority = PRIORITY_MAP.get(ticket.get("priority", "medium").lower(), "MEDIUM")
     
     # Build processed ticket
     processed = {
-        "ticket_id": ticket.get("ticket_id", f"TKT_{int(datetime.now().timestamp())}"),
+        "ticket_id": ticket.get("ticket_id", f"TKT_{int(now.timestamp())}"),
         "description": ticket.get("description", ""),
         "category": category,
         "priority": priority,
         "building_id": ticket.get("building", ""),
         "asset_id": ticket.get("asset_id", ""),
-        "reported_at": ticket.get("reported_at", datetime.now().isoformat()),
-        "processed_at": datetime.now().isoformat(),
+        "reported_at": ticket.get("reported_at", now.isoformat()),
+        "processed_at": now.isoformat(),
         "status": "ingested"
     }
     
     # Save to file (POC - in production, save to DB)
-    os.makedirs("data/tickets", exist_ok=True)
-    output_file = f"data/tickets/ingested_{datetime.now().strftime('%Y%m%d')}.jsonl"
+    output_file = _ingest_output_file(now.strftime('%Y%m%d'))
     
-    with open(output_file, "a") as f:
-        f.write(json.dumps(processed) + "\n")
+    with open(output_file, "ab") as f:
+        f.write(orjson.dumps(processed, option=orjson.OPT_APPEND_NEWLINE))
     
     print(f"✅ Ticket {processed['ticket_id']} ingested - Category: {category}, Priority: {priority}")
     
@@ -75,9 +104,6 @@ def generate_synthetic_tickets(site_id: str, n: int = 20) -> list[dict]:
     Returns:
         List of synthetic ticket dictionaries
     """
-    import random
-    from datetime import datetime, timedelta
-    
     ticket_templates = [
         {"description": "No water supply in my flat", "priority": "urgent", "building": "BLD_001"},
         {"description": "Very low water pressure", "priority": "high", "building": "BLD_001"},
@@ -90,27 +116,34 @@ def generate_synthetic_tickets(site_id: str, n: int = 20) -> list[dict]:
         {"description": "Need routine maintenance check", "priority": "low", "building": "BLD_001"},
         {"description": "Water supply timing issue", "priority": "medium", "building": "BLD_002"},
     ]
+    is_pump_ticket = ["pump" in t["description"].lower() for t in ticket_templates]
     
     buildings = ["BLD_001", "BLD_002"]
     start_date = datetime.now() - timedelta(days=30)
     
-    tickets = []
-    for i in range(n):
-        template = random.choice(ticket_templates)
-        report_date = start_date + timedelta(hours=random.randint(0, 720))
-        
-        ticket = {
+    # Draw every random field for all n tickets at once
+    rng = np.random.default_rng()
+    template_idx = rng.integers(0, len(ticket_templates), n).tolist()
+    hours = rng.integers(0, 721, n).tolist()
+    building_idx = rng.integers(0, len(buildings), n).tolist()
+    flat_floor = rng.integers(1, 5, n).tolist()
+    flat_unit = rng.integers(0, 10, n).tolist()
+    pump_building_idx = rng.integers(0, len(buildings), n).tolist()
+    pump_num = rng.integers(1, 3, n).tolist()
+    
+    tickets = [
+        {
             "ticket_id": f"TKT_{site_id}_{i+1:04d}",
             "site_id": site_id,
-            "building": random.choice(buildings),
-            "description": template["description"],
-            "priority": template["priority"],
-            "reported_at": report_date.isoformat(),
-            "flat_no": f"{random.randint(1,4)}{random.randint(0,9):02d}",
-            "asset_id": f"PUMP_{random.choice(buildings)}_{random.randint(1,2):02d}" if "pump" in template["description"].lower() else ""
+            "building": buildings[building_idx[i]],
+            "description": ticket_templates[t]["description"],
+            "priority": ticket_templates[t]["priority"],
+            "reported_at": (start_date + timedelta(hours=hours[i])).isoformat(),
+            "flat_no": f"{flat_floor[i]}{flat_unit[i]:02d}",
+            "asset_id": f"PUMP_{buildings[pump_building_idx[i]]}_{pump_num[i]:02d}" if is_pump_ticket[t] else ""
         }
-        
-        tickets.append(ticket)
+        for i, t in enumerate(template_idx)
+    ]
     
     return tickets
 
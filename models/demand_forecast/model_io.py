@@ -0,0 +1,104 @@
+"""
+Prophet artifact I/O with pickle protocol 5 out-of-band buffers.
+
+dump_model() writes `<path>` (a header naming the buffer file, the buffer
+offsets, then the pickle stream) and a per-version buffer file
+`<path>.<version>.npybuf` holding the raw NumPy buffers. load_model()
+memory-maps the buffer file so array data is paged in lazily and shared
+across processes instead of being copied through the pickle stream.
+
+Every dump gets a fresh buffer file and both files are swapped in with
+os.replace, so a process still mapping the previous version keeps a valid
+inode (never truncated under it) and readers never pair a header with the
+wrong buffers. Artifacts from older dumps (joblib, or the earlier fixed
+`<path>.npybuf` layout) still load.
+"""
+import mmap
+import os
+import pickle
+import secrets
+
+import joblib
+
+BUFFER_SUFFIX = ".npybuf"
+
+# First bytes of a header that names its buffer file
+_MAGIC = b"HNBUF2\n"
+
+# Keep every buffer start aligned for NumPy
+_ALIGN = 64
+
+
+def _read_header(model_path: str):
+    """(buffer file name, offsets) of a current-format artifact, else None."""
+    try:
+        with open(model_path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                return None
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def dump_model(model, model_path: str) -> None:
+    buffers = []
+    stream = pickle.dumps(model, protocol=5, buffer_callback=buffers.append)
+
+    directory = os.path.dirname(model_path)
+    previous = _read_header(model_path)
+    buffer_name = f"{os.path.basename(model_path)}.{secrets.token_hex(4)}{BUFFER_SUFFIX}"
+
+    # New name every version: nothing can have it mapped yet
+    offsets = []
+    with open(os.path.join(directory, buffer_name), "wb") as f:
+        for buf in buffers:
+            raw = buf.raw()
+            f.write(b"\0" * (-f.tell() % _ALIGN))
+            offsets.append((f.tell(), raw.nbytes))
+            f.write(raw)
+
+    # Header last, via rename, so it only ever names a complete buffer file
+    tmp_path = f"{model_path}.{secrets.token_hex(4)}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        pickle.dump((buffer_name, offsets), f, protocol=5)
+        f.write(stream)
+    os.replace(tmp_path, model_path)
+
+    # Old buffers: unlinking keeps existing mappings valid (the inode lives on)
+    stale = [model_path + BUFFER_SUFFIX]
+    if previous is not None:
+        stale.append(os.path.join(directory, previous[0]))
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _load_buffers(f, buffer_path: str, offsets):
+    with open(buffer_path, "rb") as bf:
+        # Copy-on-write: pages stay shared until something writes to an array
+        mapped = memoryview(mmap.mmap(bf.fileno(), 0, access=mmap.ACCESS_COPY))
+    return pickle.load(f, buffers=[mapped[start:start + size] for start, size in offsets])
+
+
+def load_model(model_path: str):
+    with open(model_path, "rb") as f:
+        if f.read(len(_MAGIC)) == _MAGIC:
+            buffer_name, offsets = pickle.load(f)
+            if not offsets:
+                return pickle.load(f)
+            buffer_path = os.path.join(os.path.dirname(model_path), buffer_name)
+            return _load_buffers(f, buffer_path, offsets)
+
+    # Earlier layout: offsets pickle first, buffers in a fixed `<path>.npybuf`
+    buffer_path = model_path + BUFFER_SUFFIX
+    if not os.path.exists(buffer_path):
+        return joblib.load(model_path)
+
+    with open(model_path, "rb") as f:
+        offsets = pickle.load(f)
+        if not offsets:
+            return pickle.load(f)
+        return _load_buffers(f, buffer_path, offsets)
@@ -1,7 +1,15 @@
 ﻿import os
+import sys
 import json
 from datetime import datetime, timezone
-import joblib
+from functools import lru_cache
+import numpy as np
+
+if __name__ == "__main__":
+    # Script entry point (python models/<package>/<module>.py): make project packages importable.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from models.demand_forecast.model_io import load_model
 
 
 ARTIFACT_DIR = "models/demand_forecast/artifacts"
@@ -14,10 +22,32 @@ def _load_metadata() -> dict:
             "metadata.json not found. Train model first:\n"
             "python models/demand_forecast/train.py"
         )
+    return _read_metadata(meta_path, os.stat(meta_path).st_mtime)
+
+
+@lru_cache(maxsize=1)
+def _read_metadata(meta_path: str, mtime: float) -> dict:
+    """Parsed metadata.json; `mtime` in the key re-reads it after a retrain."""
     with open(meta_path, "r") as f:
         return json.load(f)
 
 
+@lru_cache(maxsize=32)
+def _load_model_file(model_path: str, mtime: float):
+    """Unpickled Prophet model, kept in-process until the file changes."""
+    return load_model(model_path)
+
+
+def _load_model(model_path: str):
+    return _load_model_file(model_path, os.stat(model_path).st_mtime)
+
+
+def clear_model_cache() -> None:
+    """Drop cached metadata/models (e.g. to free memory; retrains are picked up by mtime)."""
+    _read_metadata.cache_clear()
+    _load_model_file.cache_clear()
+
+
 def _load_model_for_asset(asset_id: str):
     """
     Loads the correct Prophet model using metadata.json.
@@ -32,13 +62,13 @@ def _load_model_for_asset(asset_id: str):
     if group_col:
         for m in meta.get("models", []):
             if str(m.get("group_value")) == str(asset_id):
-                return joblib.load(m["model_path"]), meta
+                return _load_model(m["model_path"]), meta
 
         # fallback: first model
-        return joblib.load(meta["models"][0]["model_path"]), meta
+        return _load_model(meta["models"][0]["model_path"]), meta
 
     # global model case
-    return joblib.load(meta["models"][0]["model_path"]), meta
+    return _load_model(meta["models"][0]["model_path"]), meta
 
 
 def _demand_level(total_forecast: float, tank_pct: float = None) -> str:
@@ -83,6 +113,41 @@ def _recommendation_text(level: str, tank_pct: float = None) -> str:
     return "Normal consumption pattern; no immediate action required."
 
 
+def _forecast_columns(fcst_tail) -> tuple:
+    """
+    Clip/round the Prophet forecast rows in one vectorized pass.
+    Returns (column dict of timestamps/value/lower/upper, unrounded total,
+    row indices by value desc).
+    """
+    yhat = np.maximum(fcst_tail["yhat"].to_numpy(dtype=float), 0.0)  # no negative consumption
+    lower = fcst_tail["yhat_lower"].to_numpy(dtype=float) if "yhat_lower" in fcst_tail else yhat
+    upper = fcst_tail["yhat_upper"].to_numpy(dtype=float) if "yhat_upper" in fcst_tail else yhat
+
+    columns = {
+        "timestamp": fcst_tail["ds"].dt.strftime("%Y-%m-%dT%H:%M:%S").tolist(),
+        "value": np.round(yhat, 2),
+        "lower": np.round(np.maximum(lower, 0.0), 2),
+        "upper": np.round(np.maximum(upper, 0.0), 2),
+    }
+
+    # Stable, so equal values keep time order (same as sorted(..., reverse=True))
+    by_value = np.argsort(-columns["value"], kind="stable")
+    return columns, float(yhat.sum()), by_value
+
+
+def _forecast_records(columns: dict, rows=None) -> list:
+    """Column dict -> [{"timestamp", "value", "lower", "upper"}, ...] (optionally only `rows`)."""
+    timestamps = columns["timestamp"]
+    values, lower, upper = columns["value"], columns["lower"], columns["upper"]
+    if rows is not None:
+        timestamps = [timestamps[i] for i in rows]
+        values, lower, upper = values[rows], lower[rows], upper[rows]
+    return [
+        {"timestamp": ts, "value": v, "lower": lo, "upper": hi}
+        for ts, v, lo, hi in zip(timestamps, values.tolist(), lower.tolist(), upper.tolist())
+    ]
+
+
 def forecast_water_demand(asset_id: str, horizon_hours: int, tank_pct: float = None) -> dict:
     """
     Forecast water demand for next N hours.
@@ -96,35 +161,58 @@ def forecast_water_demand(asset_id: str, horizon_hours: int, tank_pct: float = N
     future = model.make_future_dataframe(periods=horizon_hours, freq=freq)
     fcst = model.predict(future)
 
-    fcst_tail = fcst.tail(horizon_hours).copy()
+    return _forecast_result(asset_id, horizon_hours, fcst, tank_pct)
 
-    series = []
-    total = 0.0
 
-    for _, row in fcst_tail.iterrows():
-        val = max(0.0, float(row["yhat"]))  # no negative consumption
-        total += val
+def forecast_water_demand_batch(asset_ids: list, horizon_hours: int, tank_pct: float = None,
+                                columnar: bool = False) -> dict:
+    """
+    Forecast several assets in one call, keyed by asset_id.
+    Models trained on the same history share one future dataframe
+    instead of each building its own.
 
-        series.append(
-            {
-                "timestamp": row["ds"].isoformat(),
-                "value": round(val, 2),
-                "lower": round(max(0.0, float(row.get("yhat_lower", val))), 2),
-                "upper": round(max(0.0, float(row.get("yhat_upper", val))), 2),
-            }
+    columnar=True returns each forecast_series as parallel columns
+    (timestamp list + numpy value/lower/upper arrays) instead of one dict
+    per hour; serialize with orjson.OPT_SERIALIZE_NUMPY.
+    """
+    futures = {}
+    results = {}
+    for asset_id in dict.fromkeys(str(a) for a in asset_ids):
+        model, meta = _load_model_for_asset(asset_id)
+        freq = meta.get("freq", "h")
+
+        history = model.history_dates
+        key = (len(history), history.iloc[0], history.iloc[-1], freq)
+        future = futures.get(key)
+        if future is None:
+            # predict() copies its input, so the frame can be reused as-is
+            future = futures[key] = model.make_future_dataframe(periods=horizon_hours, freq=freq)
+
+        results[asset_id] = _forecast_result(
+            asset_id, horizon_hours, model.predict(future), tank_pct, columnar=columnar
         )
+    return results
+
+
+def _forecast_result(asset_id: str, horizon_hours: int, fcst, tank_pct: float = None,
+                     columnar: bool = False) -> dict:
+    """Agent-friendly forecast dict from a Prophet prediction frame."""
+    fcst_tail = fcst.tail(horizon_hours)
+
+    columns, total, by_value = _forecast_columns(fcst_tail)
+    series = columns if columnar else _forecast_records(columns)
 
     # Adjust demand level based on tank percentage if provided
     level = _demand_level(total, tank_pct=tank_pct)
     recommendation = _recommendation_text(level, tank_pct=tank_pct)
 
-    forecast_start = series[0]["timestamp"] if series else None
-    forecast_end = series[-1]["timestamp"] if series else None
+    timestamps = columns["timestamp"]
+    forecast_start = timestamps[0] if timestamps else None
+    forecast_end = timestamps[-1] if timestamps else None
 
     # Find peak hour and top 3 hours
-    sorted_series = sorted(series, key=lambda x: x["value"], reverse=True)
-    peak = sorted_series[0] if sorted_series else None
-    top3 = sorted_series[:3] if len(sorted_series) >= 3 else sorted_series
+    top3 = _forecast_records(columns, by_value[:3])
+    peak = top3[0] if top3 else None
 
     return {
         "status": "ok",
@@ -1,9 +1,15 @@
 ﻿import os
+import sys
 import json
 from datetime import datetime, timezone
 import pandas as pd
 from prophet import Prophet
-import joblib
+
+if __name__ == "__main__":
+    # Script entry point (python models/<package>/<module>.py): make project packages importable.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from models.demand_forecast.model_io import dump_model
 
 
 DATA_PATH = "data/samples/water_consumption.csv"
@@ -129,7 +135,7 @@ def train_all_models(
             model.fit(prophet_df)
 
             model_path = os.path.join(artifact_dir, f"prophet_{group_col}_{g}.pkl")
-            joblib.dump(model, model_path)
+            dump_model(model, model_path)
 
             metadata["models"].append(
                 {"group_value": str(g), "model_path": model_path, "n_rows": len(prophet_df)}
@@ -154,7 +160,7 @@ def train_all_models(
         model.fit(prophet_df)
 
         model_path = os.path.join(artifact_dir, "prophet_global.pkl")
-        joblib.dump(model, model_path)
+        dump_model(model, model_path)
 
         metadata["models"].append(
             {"group_value": "GLOBAL", "model_path": model_path, "n_rows": len(prophet_df)}
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# 24 hours = 48 readings at 30min intervals
+ROLLING_WINDOW = 48
+# 12 hours back
+LAG_READINGS = 24
+
+ROLLING_AGGS = {
+    'vibration_mm_s': ['mean', 'std', 'max'],
+    'temperature_celsius': ['mean', 'std', 'max'],
+    'current_amps': ['mean', 'std'],
+}
+
+# (source column, aggregation) -> feature name
+ROLLING_FEATURES = {
+    ('vibration_mm_s', 'mean'): 'vibration_rolling_mean_24h',
+    ('vibration_mm_s', 'std'): 'vibration_rolling_std_24h',
+    ('vibration_mm_s', 'max'): 'vibration_rolling_max_24h',
+    ('temperature_celsius', 'mean'): 'temp_rolling_mean_24h',
+    ('temperature_celsius', 'std'): 'temp_rolling_std_24h',
+    ('temperature_celsius', 'max'): 'temp_rolling_max_24h',
+    ('current_amps', 'mean'): 'current_rolling_mean_24h',
+    ('current_amps', 'std'): 'current_rolling_std_24h',
+}
+
+TREND_COLUMNS = ['vibration_mm_s', 'temperature_celsius']
+
+
+def _rolling_kernel(values, starts, ends, window, out):
+    """
+    Trailing-window mean/std/max per contiguous group, one column of `values`
+    at a time. Writes out[:, 3*c : 3*c+3] = (mean, std, max) for column c;
+    std is NaN for a single-value window (same as pandas ddof=1).
+    """
+    n_cols = values.shape[1]
+    for g in prange(len(starts)):
+        start, end = starts[g], ends[g]
+        for i in range(start, end):
+            lo = max(start, i - window + 1)
+            count = i - lo + 1
+            for c in range(n_cols):
+                total = 0.0
+                peak = values[lo, c]
+                for j in range(lo, i + 1):
+                    v = values[j, c]
+                    total += v
+                    if v > peak:
+                        peak = v
+                mean = total / count
+                if count > 1:
+                    sq = 0.0
+                    for j in range(lo, i + 1):
+                        d = values[j, c] - mean
+                        sq += d * d
+                    std = np.sqrt(sq / (count - 1))
+                else:
+                    std = np.nan
+                out[i, 3 * c] = mean
+                out[i, 3 * c + 1] = std
+                out[i, 3 * c + 2] = peak
+
+
+if HAS_NUMBA:
+    prange = numba.prange
+    _rolling_kernel = numba.njit(parallel=True, cache=True)(_rolling_kernel)
+else:
+    prange = range
+
+
+def _group_bounds(pump_ids: pd.Series):
+    """(starts, ends) of each pump's rows, or None if a pump's rows are not contiguous."""
+    codes, uniques = pd.factorize(pump_ids, sort=False)
+    starts = np.flatnonzero(np.diff(codes)) + 1
+    if len(starts) != len(uniques) - 1:
+        return None
+    starts = np.concatenate(([0], starts)).astype(np.int64)
+    ends = np.concatenate((starts[1:], [len(codes)])).astype(np.int64)
+    return starts, ends
+
+
+def _rolling_features_jit(df_pumps: pd.DataFrame, bounds) -> pd.DataFrame:
+    """ROLLING_FEATURES via the compiled kernel (one pass over each pump's slice)."""
+    source_cols = list(ROLLING_AGGS)
+    values = np.ascontiguousarray(df_pumps[source_cols].to_numpy(dtype=np.float64))
+    out = np.empty((len(values), 3 * len(source_cols)))
+    _rolling_kernel(values, bounds[0], bounds[1], ROLLING_WINDOW, out)
+
+    columns = {}
+    for c, col in enumerate(source_cols):
+        for k, agg in enumerate(('mean', 'std', 'max')):
+            name = ROLLING_FEATURES.get((col, agg))
+            if name:
+                columns[name] = out[:, 3 * c + k]
+    return pd.DataFrame(columns, index=df_pumps.index)
+
+
+def add_pump_features(df_pumps: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the engineered model features in place (rows sorted by pump, then time).
+    One groupby is shared by every rolling/diff/shift pass.
+    """
+    grouped = df_pumps.groupby('pump_id', sort=False, observed=True)
+
+    # Rolling window features: compiled single pass when numba is available,
+    # else one pandas windowed pass per source column
+    bounds = _group_bounds(df_pumps['pump_id']) if HAS_NUMBA else None
+    if bounds is not None:
+        rolled = _rolling_features_jit(df_pumps, bounds)
+        for name in ROLLING_FEATURES.values():
+            df_pumps[name] = rolled[name]
+    else:
+        rolled = grouped[list(ROLLING_AGGS)].rolling(ROLLING_WINDOW, min_periods=1).agg(ROLLING_AGGS)
+        rolled = rolled.reset_index(0, drop=True)
+        for key, name in ROLLING_FEATURES.items():
+            df_pumps[name] = rolled[key]
+
+    # Rate of change (trend detection)
+    change = grouped[TREND_COLUMNS].diff().fillna(0)
+    df_pumps['vibration_change'] = change['vibration_mm_s']
+    df_pumps['temp_change'] = change['temperature_celsius']
+
+    # Lag features (values 12 hours ago)
+    lagged = grouped[TREND_COLUMNS].shift(LAG_READINGS).fillna(df_pumps[TREND_COLUMNS])
+    df_pumps['vibration_lag_12h'] = lagged['vibration_mm_s']
+    df_pumps['temp_lag_12h'] = lagged['temperature_celsius']
+
+    # Interaction features
+    df_pumps['vib_temp_interaction'] = df_pumps['vibration_mm_s'] * df_pumps['temperature_celsius']
+
+    # Threshold-based features (0/1 flags: one byte per row is enough)
+    df_pumps['vibration_above_threshold'] = (df_pumps['vibration_mm_s'] > 6).astype(np.int8)
+    df_pumps['temp_above_threshold'] = (df_pumps['temperature_celsius'] > 60).astype(np.int8)
+
+    return df_pumps
+
+
+def pump_features_at(columns: dict, pos: int) -> dict:
+    """
+    add_pump_features() for one row, straight from one pump's time-ordered
+    column arrays ({column: ndarray}). NumPy reductions over the trailing
+    window only; no DataFrame or groupby is built.
+    """
+    lo = max(0, pos - ROLLING_WINDOW + 1)
+    features = {}
+    for col, aggs in ROLLING_AGGS.items():
+        window = columns[col][lo:pos + 1]
+        for agg in aggs:
+            if agg == 'std':
+                # ddof=1 like pandas; a single value has no spread (NaN)
+                value = window.std(ddof=1) if len(window) > 1 else np.nan
+            else:
+                value = getattr(window, agg)()
+            features[ROLLING_FEATURES[(col, agg)]] = value
+
+    vibration = columns['vibration_mm_s']
+    temperature = columns['temperature_celsius']
+    vib, temp = vibration[pos], temperature[pos]
+
+    # Rate of change (first reading has none)
+    features['vibration_change'] = vib - vibration[pos - 1] if pos > 0 else 0.0
+    features['temp_change'] = temp - temperature[pos - 1] if pos > 0 else 0.0
+
+    # Lag features (current value until 12 hours of history exist)
+    lag = pos - LAG_READINGS
+    features['vibration_lag_12h'] = vibration[lag] if lag >= 0 else vib
+    features['temp_lag_12h'] = temperature[lag] if lag >= 0 else temp
+
+    features['vib_temp_interaction'] = vib * temp
+    features['vibration_above_threshold'] = int(vib > 6)
+    features['temp_above_threshold'] = int(temp > 60)
+    return features
@@ -3,113 +3,224 @@ import numpy as np
 import pickle
 import json
 import os
+import sys
 from datetime import datetime, timedelta
+from functools import lru_cache
 
-def predict_failure_risk(asset_id: str, horizon_hours: int = 48, timestamp=None) -> dict:
+try:
+    import pyarrow.dataset as pa_ds
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+if __name__ == "__main__":
+    # Script entry point (python models/<package>/<module>.py): make project packages importable.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from models.predictive_maintenance.features import pump_features_at
+
+# column -> [(threshold, signal template), ...]; the first exceeded tier is reported
+SIGNAL_RULES = [
+    ('vibration_mm_s', [
+        (8, "⚠️ Vibration very high: {value:.1f} mm/s (threshold: 6.0)"),
+        (6, "⚠️ Vibration elevated: {value:.1f} mm/s (threshold: 6.0)"),
+    ]),
+    ('temperature_celsius', [
+        (65, "🔥 Temperature very high: {value:.1f}°C (threshold: 60.0)"),
+        (60, "🔥 Temperature elevated: {value:.1f}°C (threshold: 60.0)"),
+    ]),
+    ('vibration_change', [(1, "📈 Rapid vibration increase: +{value:.2f} mm/s")]),
+    ('temp_change', [(3, "📈 Rapid temperature increase: +{value:.1f}°C")]),
+    ('current_amps', [(11, "⚡ Current high: {value:.2f} A")]),
+]
+
+MODEL_PATH = 'models/predictive_maintenance/artifacts/model.pkl'
+SCALER_PATH = 'models/predictive_maintenance/artifacts/scaler.pkl'
+METADATA_PATH = 'models/predictive_maintenance/artifacts/metadata.json'
+PUMP_DATA_PATH = 'data/samples/water_pumps.csv'
+# Typed/columnar copy (written by generate_poc_data.py or train.convert_csv_to_parquet)
+PUMP_PARQUET_PATH = 'data/samples/water_pumps.parquet'
+
+# Only the columns prediction reads; ids/status as categoricals (integer compares)
+PUMP_VALUE_COLUMNS = [
+    'current_amps', 'vibration_mm_s', 'temperature_celsius', 'flow_rate_lpm', 'pressure_psi',
+]
+PUMP_DATA_COLUMNS = ['pump_id', 'timestamp', 'status'] + PUMP_VALUE_COLUMNS
+PUMP_DATA_DTYPES = {'pump_id': 'category', 'status': 'category'}
+# Format of the pump CSV's timestamp column
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+@lru_cache(maxsize=4)
+def _load_pickle_file(path: str, mtime: float):
+    """Unpickled artifact, kept in-process until the file changes."""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+@lru_cache(maxsize=1)
+def _read_scaler_params(path: str, mtime: float) -> tuple:
     """
-    Predict asset failure risk score for the next horizon.
-    
-    Args:
-        asset_id: Pump ID (e.g., 'PUMP_BLD_001_01')
-        horizon_hours: Prediction horizon (default 48 hours)
-        timestamp: Specific timestamp to predict from (optional, defaults to latest non-failed reading)
-    
-    Returns:
-        dict with risk_score, risk_level, and signals
+    (mean, scale) of the fitted StandardScaler, as float32 arrays.
+    Divide rather than multiply by 1/scale: sklearn divides, and one ulp can
+    flip a tree split near its threshold.
     """
+    scaler = _load_pickle_file(path, mtime)
+    return scaler.mean_.astype(np.float32), scaler.scale_.astype(np.float32)
+
+
+@lru_cache(maxsize=1)
+def _read_metadata(path: str, mtime: float) -> dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def _read_pump_data(path: str, mtime: float) -> pd.DataFrame:
+    """
+    Pump readings with parsed timestamps, sorted by pump then time so each
+    pump's rows are one contiguous block (callers must not mutate it).
+    """
+    df_pumps = pd.read_csv(path, usecols=PUMP_DATA_COLUMNS, dtype=PUMP_DATA_DTYPES,
+                           parse_dates=['timestamp'], date_format=TIMESTAMP_FORMAT)
+    if not pd.api.types.is_datetime64_any_dtype(df_pumps['timestamp']):
+        # Not in TIMESTAMP_FORMAT: read_csv leaves strings, fall back to inference
+        df_pumps['timestamp'] = pd.to_datetime(df_pumps['timestamp'])
+    return df_pumps.sort_values(['pump_id', 'timestamp'], kind='stable', ignore_index=True)
+
+
+def _pump_columns(df_pumps: pd.DataFrame) -> dict:
+    """{column: ndarray} for time-ordered rows; float columns as contiguous float64."""
+    columns = {'timestamp': df_pumps['timestamp'].to_numpy(), 'status': df_pumps['status'].to_numpy(dtype=object)}
+    for col in PUMP_VALUE_COLUMNS:
+        columns[col] = np.ascontiguousarray(df_pumps[col].to_numpy(dtype=np.float64))
+    return columns
+
+
+@lru_cache(maxsize=1)
+def _read_pump_store(path: str, mtime: float) -> tuple:
+    """
+    Column arrays for the whole CSV (pump-major, time-ordered) plus
+    pump_id -> (start, end); a pump's rows are zero-copy slices of each array.
+    """
+    df_pumps = _read_pump_data(path, mtime)
+    codes = df_pumps['pump_id'].cat.codes.to_numpy()
+    categories = df_pumps['pump_id'].cat.categories
+    starts = np.searchsorted(codes, np.arange(len(categories)), side='left')
+    ends = np.searchsorted(codes, np.arange(len(categories)), side='right')
+    slices = {pid: (int(lo), int(hi)) for pid, lo, hi in zip(categories, starts, ends) if hi > lo}
+    return _pump_columns(df_pumps), slices
+
+
+@lru_cache(maxsize=32)
+def _read_pump_rows_parquet(path: str, mtime: float, asset_id: str) -> pd.DataFrame:
+    """One pump's readings; the pump_id filter is pushed down into the Parquet scan."""
+    dataset = pa_ds.dataset(path, format='parquet')
+    table = dataset.to_table(columns=PUMP_DATA_COLUMNS, filter=pa_ds.field('pump_id') == asset_id)
+    return table.to_pandas()
+
+
+def _load_artifacts() -> tuple:
+    """(booster, (mean, scale), metadata); `mtime` in the cache keys picks up a retrain."""
+    return (
+        _load_pickle_file(MODEL_PATH, os.stat(MODEL_PATH).st_mtime).get_booster(),
+        _read_scaler_params(SCALER_PATH, os.stat(SCALER_PATH).st_mtime),
+        _read_metadata(METADATA_PATH, os.stat(METADATA_PATH).st_mtime),
+    )
+
+
+def _load_pump_rows(asset_id: str) -> dict:
+    """
+    One pump's time-ordered readings as {column: ndarray}: selective Parquet
+    read when available and current, else slices of the cached CSV store.
+    """
+    if HAS_PYARROW and os.path.exists(PUMP_PARQUET_PATH):
+        parquet_mtime = os.stat(PUMP_PARQUET_PATH).st_mtime
+        if not os.path.exists(PUMP_DATA_PATH) or parquet_mtime >= os.stat(PUMP_DATA_PATH).st_mtime:
+            pump_data = _read_pump_rows_parquet(PUMP_PARQUET_PATH, parquet_mtime, asset_id)
+            return _pump_columns(pump_data.sort_values('timestamp'))
+
+    columns, slices = _read_pump_store(PUMP_DATA_PATH, os.stat(PUMP_DATA_PATH).st_mtime)
+    start, end = slices.get(asset_id, (0, 0))
+    return {col: values[start:end] for col, values in columns.items()}
+
+
+def warm_model_cache() -> bool:
+    """
+    Load the artifacts and pump store ahead of the first prediction
+    (e.g. at API startup). Returns False if the model isn't trained yet.
+    """
+    if not os.path.exists(MODEL_PATH):
+        return False
+    _load_artifacts()
+    if os.path.exists(PUMP_DATA_PATH):
+        _read_pump_store(PUMP_DATA_PATH, os.stat(PUMP_DATA_PATH).st_mtime)
+    return True
+
+
+def clear_model_cache() -> None:
+    """Drop cached artifacts and pump data (retrains are picked up by mtime anyway)."""
+    _load_pickle_file.cache_clear()
+    _read_scaler_params.cache_clear()
+    _read_metadata.cache_clear()
+    _read_pump_data.cache_clear()
+    _read_pump_store.cache_clear()
+    _read_pump_rows_parquet.cache_clear()
+
+
+def _unknown_result(asset_id: str, horizon_hours: int, signal: str) -> dict:
+    return {
+        "asset_id": asset_id,
+        "horizon_hours": horizon_hours,
+        "risk_score": 0.0,
+        "risk_level": "UNKNOWN",
+        "signals": [signal]
+    }
+
+
+@lru_cache(maxsize=256)
+def _parse_timestamp(timestamp: str) -> np.datetime64:
+    return pd.to_datetime(timestamp).to_datetime64()
+
+
+def _nearest_position(ts: np.ndarray, target: np.datetime64) -> int:
+    """Row closest to `target` in sorted, unique timestamps (earlier row on a tie)."""
+    i = int(np.searchsorted(ts, target))
+    if i < len(ts) and (i == 0 or ts[i] - target < target - ts[i - 1]):
+        return i
+    return i - 1
+
+
+def _target_reading(pump_data: dict, timestamp=None) -> dict:
+    """The pump's reading to score (raw columns plus engineered features)."""
+    timestamps = pump_data['timestamp']
     
-    # Load model artifacts
-    model_path = 'models/predictive_maintenance/artifacts/model.pkl'
-    scaler_path = 'models/predictive_maintenance/artifacts/scaler.pkl'
-    metadata_path = 'models/predictive_maintenance/artifacts/metadata.json'
-    
-    if not os.path.exists(model_path):
-        return {
-            "asset_id": asset_id,
-            "horizon_hours": horizon_hours,
-            "risk_score": 0.0,
-            "risk_level": "UNKNOWN",
-            "signals": ["Model not trained yet"]
-        }
-    
-    # Load model and scaler
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
-    
-    with open(scaler_path, 'rb') as f:
-        scaler = pickle.load(f)
-    
-    with open(metadata_path, 'r') as f:
-        metadata = json.load(f)
-    
-    feature_cols = metadata['features']
-    
-    # Load pump data
-    data_path = 'data/samples/water_pumps.csv'
-    df_pumps = pd.read_csv(data_path)
-    df_pumps['timestamp'] = pd.to_datetime(df_pumps['timestamp'])
-    
-    # Get data for this pump
-    pump_data = df_pumps[df_pumps['pump_id'] == asset_id].copy()
-    
-    if len(pump_data) == 0:
-        return {
-            "asset_id": asset_id,
-            "horizon_hours": horizon_hours,
-            "risk_score": 0.0,
-            "risk_level": "UNKNOWN",
-            "signals": [f"Pump '{asset_id}' not found in data"]
-        }
-    
-    pump_data = pump_data.sort_values('timestamp')
-    
-    # Feature engineering (same as training)
-    pump_data['vibration_rolling_mean_24h'] = pump_data['vibration_mm_s'].rolling(48, min_periods=1).mean()
-    pump_data['vibration_rolling_std_24h'] = pump_data['vibration_mm_s'].rolling(48, min_periods=1).std()
-    pump_data['vibration_rolling_max_24h'] = pump_data['vibration_mm_s'].rolling(48, min_periods=1).max()
-    
-    pump_data['temp_rolling_mean_24h'] = pump_data['temperature_celsius'].rolling(48, min_periods=1).mean()
-    pump_data['temp_rolling_std_24h'] = pump_data['temperature_celsius'].rolling(48, min_periods=1).std()
-    pump_data['temp_rolling_max_24h'] = pump_data['temperature_celsius'].rolling(48, min_periods=1).max()
-    
-    pump_data['current_rolling_mean_24h'] = pump_data['current_amps'].rolling(48, min_periods=1).mean()
-    pump_data['current_rolling_std_24h'] = pump_data['current_amps'].rolling(48, min_periods=1).std()
-    
-    pump_data['vibration_change'] = pump_data['vibration_mm_s'].diff().fillna(0)
-    pump_data['temp_change'] = pump_data['temperature_celsius'].diff().fillna(0)
-    
-    pump_data['vibration_lag_12h'] = pump_data['vibration_mm_s'].shift(24).fillna(pump_data['vibration_mm_s'])
-    pump_data['temp_lag_12h'] = pump_data['temperature_celsius'].shift(24).fillna(pump_data['temperature_celsius'])
-    
-    pump_data['vib_temp_interaction'] = pump_data['vibration_mm_s'] * pump_data['temperature_celsius']
-    pump_data['vibration_above_threshold'] = (pump_data['vibration_mm_s'] > 6).astype(int)
-    pump_data['temp_above_threshold'] = (pump_data['temperature_celsius'] > 60).astype(int)
-    
-    # Get the right reading - if no timestamp specified, use last non-failed reading
+    # Get the right reading (row position) - if no timestamp specified, use last non-failed reading
     if timestamp is None:
         # Find last reading before failure (if pump failed) or just last reading
-        failed_readings = pump_data[pump_data['status'] == 'failed']
-        if len(failed_readings) > 0:
+        failed = pump_data['status'] == 'failed'
+        if failed.any():
             # Get reading 48 hours before failure for demo purposes
-            failure_time = failed_readings.iloc[0]['timestamp']
-            target_time = failure_time - timedelta(hours=48)
-            idx = (pump_data['timestamp'] - target_time).abs().idxmin()
-            latest = pump_data.loc[idx]
+            failure_time = timestamps[failed.argmax()]
+            target_time = failure_time - np.timedelta64(48, 'h')
+            pos = _nearest_position(timestamps, target_time)
         else:
             # Use latest reading
-            latest = pump_data.iloc[-1]
+            pos = len(timestamps) - 1
     else:
         # Use specified timestamp
-        idx = (pump_data['timestamp'] - pd.to_datetime(timestamp)).abs().idxmin()
-        latest = pump_data.loc[idx]
-    
-    # Prepare features (convert to numpy array to avoid feature name warning)
-    X = latest[feature_cols].values.reshape(1, -1)
-    X_scaled = scaler.transform(X)
-    
-    # Predict
-    risk_prob = model.predict_proba(X_scaled)[0][1]
-    
+        # Parsed once per distinct value (str), or converted directly (datetime-like)
+        target = _parse_timestamp(timestamp) if isinstance(timestamp, str) else pd.Timestamp(timestamp).to_datetime64()
+        pos = _nearest_position(timestamps, target)
+    
+    reading = {col: values[pos] for col, values in pump_data.items()}
+    reading['timestamp'] = pd.Timestamp(reading['timestamp'])
+    # Feature engineering (same as training), from the arrays directly
+    reading.update(pump_features_at(pump_data, pos))
+    return reading
+
+
+def _risk_result(asset_id: str, horizon_hours: int, latest: dict, risk_prob: float) -> dict:
     # Determine risk level
     if risk_prob >= 0.8:
         risk_level = "CRITICAL"
@@ -123,24 +234,12 @@ def predict_failure_risk(asset_id: str, horizon_hours: int = 48, timestamp=None)
     # Generate signals
     signals = []
     
-    if latest['vibration_mm_s'] > 8:
-        signals.append(f"⚠️ Vibration very high: {latest['vibration_mm_s']:.1f} mm/s (threshold: 6.0)")
-    elif latest['vibration_mm_s'] > 6:
-        signals.append(f"⚠️ Vibration elevated: {latest['vibration_mm_s']:.1f} mm/s (threshold: 6.0)")
-    
-    if latest['temperature_celsius'] > 65:
-        signals.append(f"🔥 Temperature very high: {latest['temperature_celsius']:.1f}°C (threshold: 60.0)")
-    elif latest['temperature_celsius'] > 60:
-        signals.append(f"🔥 Temperature elevated: {latest['temperature_celsius']:.1f}°C (threshold: 60.0)")
-    
-    if latest['vibration_change'] > 1:
-        signals.append(f"📈 Rapid vibration increase: +{latest['vibration_change']:.2f} mm/s")
-    
-    if latest['temp_change'] > 3:
-        signals.append(f"📈 Rapid temperature increase: +{latest['temp_change']:.1f}°C")
-    
-    if latest['current_amps'] > 11:
-        signals.append(f"⚡ Current high: {latest['current_amps']:.2f} A")
+    for column, tiers in SIGNAL_RULES:
+        value = latest[column]
+        for threshold, template in tiers:
+            if value > threshold:
+                signals.append(template.format(value=value))
+                break
     
     if len(signals) == 0:
         signals.append("✅ All parameters within normal range")
@@ -163,6 +262,60 @@ def predict_failure_risk(asset_id: str, horizon_hours: int = 48, timestamp=None)
     }
 
 
+def predict_failure_risk_batch(asset_ids: list, horizon_hours: int = 48, timestamp=None) -> dict:
+    """
+    Score several pumps in one call, keyed by asset_id.
+    Feature rows are stacked so the scaler and model run once for the batch.
+    """
+    asset_ids = list(dict.fromkeys(asset_ids))
+    
+    if not os.path.exists(MODEL_PATH):
+        return {a: _unknown_result(a, horizon_hours, "Model not trained yet") for a in asset_ids}
+    
+    # Load model and scaler (cached per process)
+    booster, (mean, scale), metadata = _load_artifacts()
+    
+    feature_cols = metadata['features']
+    
+    results = {}
+    readings = {}
+    for asset_id in asset_ids:
+        # Get data for this pump (cached per data file version)
+        pump_data = _load_pump_rows(asset_id)
+        if len(pump_data['timestamp']) == 0:
+            results[asset_id] = _unknown_result(asset_id, horizon_hours, f"Pump '{asset_id}' not found in data")
+        else:
+            readings[asset_id] = _target_reading(pump_data, timestamp)
+    
+    if readings:
+        # Prepare features (numpy array avoids the feature name warning; float32 as in training)
+        X = np.array([[latest[c] for c in feature_cols] for latest in readings.values()], dtype=np.float32)
+        # Same as scaler.transform + predict_proba[:, 1], minus sklearn's
+        # input validation and the DMatrix build
+        risk_probs = booster.inplace_predict((X - mean) / scale)
+        
+        for (asset_id, latest), risk_prob in zip(readings.items(), risk_probs):
+            results[asset_id] = _risk_result(asset_id, horizon_hours, latest, risk_prob)
+    
+    # Keep the caller's order
+    return {a: results[a] for a in asset_ids}
+
+
+def predict_failure_risk(asset_id: str, horizon_hours: int = 48, timestamp=None) -> dict:
+    """
+    Predict asset failure risk score for the next horizon.
+    
+    Args:
+        asset_id: Pump ID (e.g., 'PUMP_BLD_001_01')
+        horizon_hours: Prediction horizon (default 48 hours)
+        timestamp: Specific timestamp to predict from (optional, defaults to latest non-failed reading)
+    
+    Returns:
+        dict with risk_score, risk_level, and signals
+    """
+    return predict_failure_risk_batch([asset_id], horizon_hours, timestamp)[asset_id]
+
+
 if __name__ == '__main__':
     # Test all pumps
     print("="*70)
@@ -176,12 +329,14 @@ if __name__ == '__main__':
         'PUMP_BLD_002_02',  # Healthy
     ]
     
+    results = predict_failure_risk_batch(pumps, horizon_hours=48)
+    
     for pump_id in pumps:
         print(f"\n{'='*70}")
         print(f"🔧 Pump: {pump_id}")
         print('='*70)
         
-        result = predict_failure_risk(pump_id, horizon_hours=48)
+        result = results[pump_id]
         
         print(f"📅 Prediction Time: {result['timestamp']}")
         print(f"📊 Risk Score: {result['risk_score']:.3f}")
@@ -8,6 +8,25 @@ from sklearn.metrics import classification_report, confusion_matrix, recall_scor
 import pickle
 import json
 import os
+import sys
+
+if __name__ == "__main__":
+    # Script entry point (python models/<package>/<module>.py): make project packages importable.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from models.predictive_maintenance.features import add_pump_features
+
+def convert_csv_to_parquet(data_path: str, parquet_path: str = None) -> str:
+    """
+    One-time conversion of the pump CSV to a typed Parquet file (needs pyarrow).
+    predict.py then reads single pumps from it with a pump_id filter.
+    """
+    parquet_path = parquet_path or os.path.splitext(data_path)[0] + '.parquet'
+    df_pumps = pd.read_csv(data_path, dtype={'pump_id': 'category', 'status': 'category'},
+                           parse_dates=['timestamp'])
+    df_pumps.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+    return parquet_path
+
 
 def train_failure_risk_model(data_path: str, model_out_path: str) -> str:
     """
@@ -27,40 +46,14 @@ def train_failure_risk_model(data_path: str, model_out_path: str) -> str:
     
     # === 1. Load Data ===
     print("\n📊 Loading pump data...")
-    df_pumps = pd.read_csv(data_path)
-    df_pumps['timestamp'] = pd.to_datetime(df_pumps['timestamp'])
+    df_pumps = pd.read_csv(data_path, parse_dates=['timestamp'])
     print(f"   Loaded {len(df_pumps)} rows, {df_pumps['pump_id'].nunique()} pumps")
     
     # === 2. Feature Engineering ===
     print("\n🔧 Creating features...")
     df_pumps = df_pumps.sort_values(['pump_id', 'timestamp'])
     
-    # Rolling window features (24 hours = 48 readings at 30min intervals)
-    df_pumps['vibration_rolling_mean_24h'] = df_pumps.groupby('pump_id')['vibration_mm_s'].rolling(48, min_periods=1).mean().reset_index(0, drop=True)
-    df_pumps['vibration_rolling_std_24h'] = df_pumps.groupby('pump_id')['vibration_mm_s'].rolling(48, min_periods=1).std().reset_index(0, drop=True)
-    df_pumps['vibration_rolling_max_24h'] = df_pumps.groupby('pump_id')['vibration_mm_s'].rolling(48, min_periods=1).max().reset_index(0, drop=True)
-    
-    df_pumps['temp_rolling_mean_24h'] = df_pumps.groupby('pump_id')['temperature_celsius'].rolling(48, min_periods=1).mean().reset_index(0, drop=True)
-    df_pumps['temp_rolling_std_24h'] = df_pumps.groupby('pump_id')['temperature_celsius'].rolling(48, min_periods=1).std().reset_index(0, drop=True)
-    df_pumps['temp_rolling_max_24h'] = df_pumps.groupby('pump_id')['temperature_celsius'].rolling(48, min_periods=1).max().reset_index(0, drop=True)
-    
-    df_pumps['current_rolling_mean_24h'] = df_pumps.groupby('pump_id')['current_amps'].rolling(48, min_periods=1).mean().reset_index(0, drop=True)
-    df_pumps['current_rolling_std_24h'] = df_pumps.groupby('pump_id')['current_amps'].rolling(48, min_periods=1).std().reset_index(0, drop=True)
-    
-    # Rate of change (trend detection)
-    df_pumps['vibration_change'] = df_pumps.groupby('pump_id')['vibration_mm_s'].diff().fillna(0)
-    df_pumps['temp_change'] = df_pumps.groupby('pump_id')['temperature_celsius'].diff().fillna(0)
-    
-    # Lag features (values 12 hours ago)
-    df_pumps['vibration_lag_12h'] = df_pumps.groupby('pump_id')['vibration_mm_s'].shift(24).fillna(df_pumps['vibration_mm_s'])
-    df_pumps['temp_lag_12h'] = df_pumps.groupby('pump_id')['temperature_celsius'].shift(24).fillna(df_pumps['temperature_celsius'])
-    
-    # Interaction features
-    df_pumps['vib_temp_interaction'] = df_pumps['vibration_mm_s'] * df_pumps['temperature_celsius']
-    
-    # Threshold-based features
-    df_pumps['vibration_above_threshold'] = (df_pumps['vibration_mm_s'] > 6).astype(int)
-    df_pumps['temp_above_threshold'] = (df_pumps['temperature_celsius'] > 60).astype(int)
+    df_pumps = add_pump_features(df_pumps)
     
     print(f"   Created {len(df_pumps.columns) - 11} engineered features")
     
@@ -70,20 +63,12 @@ def train_failure_risk_model(data_path: str, model_out_path: str) -> str:
     # Find failure times for each pump
     failure_times = df_pumps[df_pumps['status'] == 'failed'].groupby('pump_id')['timestamp'].first()
     
-    def create_failure_label(row):
-        pump_id = row['pump_id']
-        current_time = row['timestamp']
-        
-        if pump_id in failure_times.index:
-            failure_time = failure_times[pump_id]
-            hours_to_failure = (failure_time - current_time).total_seconds() / 3600
-            
-            # Label = 1 if failure within 48 hours
-            if 0 < hours_to_failure <= 48:
-                return 1
-        return 0
-    
-    df_pumps['will_fail_48h'] = df_pumps.apply(create_failure_label, axis=1)
+    # Hours until this pump's first failure (NaN for pumps that never fail)
+    failure_time = df_pumps['pump_id'].map(failure_times)
+    hours_to_failure = (failure_time - df_pumps['timestamp']).dt.total_seconds().to_numpy() / 3600
+    
+    # Label = 1 if failure within 48 hours (NaN compares False -> 0)
+    df_pumps['will_fail_48h'] = ((hours_to_failure > 0) & (hours_to_failure <= 48)).astype(int)
     
     failure_count = df_pumps['will_fail_48h'].sum()
     normal_count = (df_pumps['will_fail_48h'] == 0).sum()
@@ -108,7 +93,9 @@ def train_failure_risk_model(data_path: str, model_out_path: str) -> str:
     # Remove rows with NaN
     df_model = df_pumps.dropna(subset=feature_cols + ['will_fail_48h'])
     
-    X = df_model[feature_cols]
+    # float32 end to end: XGBoost works in float32 anyway, and the scaler's
+    # fit/transform touches half the bytes
+    X = df_model[feature_cols].to_numpy(dtype=np.float32)
     y = df_model['will_fail_48h']
     
     print(f"   Training samples: {len(X)}")
@@ -122,7 +109,12 @@ def train_failure_risk_model(data_path: str, model_out_path: str) -> str:
     # === 6. Scale Features ===
     print("\n⚖️  Scaling features...")
     scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
+    scaler.fit(X_train)
+    # Keep the stored statistics float32 so transform() stays float32 at inference
+    scaler.mean_ = scaler.mean_.astype(np.float32)
+    scaler.var_ = scaler.var_.astype(np.float32)
+    scaler.scale_ = scaler.scale_.astype(np.float32)
+    X_train_scaled = scaler.transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
     # === 7. Train XGBoost Model ===
@@ -182,13 +174,13 @@ def train_failure_risk_model(data_path: str, model_out_path: str) -> str:
     # Save model
     model_file = os.path.join(model_out_path, 'model.pkl')
     with open(model_file, 'wb') as f:
-        pickle.dump(model, f)
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
     print(f"   ✅ Model saved: {model_file}")
     
     # Save scaler
     scaler_file = os.path.join(model_out_path, 'scaler.pkl')
     with open(scaler_file, 'wb') as f:
-        pickle.dump(scaler, f)
+        pickle.dump(scaler, f, protocol=pickle.HIGHEST_PROTOCOL)
     print(f"   ✅ Scaler saved: {scaler_file}")
     
     # Save feature list and metadata
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import os
 import time
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
 CONFIG = {
@@ -14,6 +16,30 @@ CONFIG = {
     "pressure_low": 30,
 }
 
+# Format the sample/generated CSVs are written in
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _read_timestamped_csv(path: str, name: str) -> pd.DataFrame:
+    """read_csv with 'timestamp' parsed during the read (no second to_datetime pass)."""
+    try:
+        # Known format takes pandas' fast strptime path instead of format inference
+        df = pd.read_csv(path, parse_dates=["timestamp"], date_format=TIMESTAMP_FORMAT)
+    except ValueError:
+        if "timestamp" in pd.read_csv(path, nrows=0).columns:
+            raise
+        raise ValueError(f"{name} must have 'timestamp' column") from None
+    if not pd.api.types.is_datetime64_any_dtype(df["timestamp"]):
+        # Some other format: read_csv leaves the strings as-is, so parse generically
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df
+
+
+@lru_cache(maxsize=256)
+def _parse_at_time(at_time: str) -> np.datetime64:
+    """at_time string -> datetime64; dashboards poll with the same few values."""
+    return pd.to_datetime(at_time).to_datetime64()
+
 
 class AssetService:
     def __init__(
@@ -29,30 +55,20 @@ class AssetService:
         # Same behavior for worst-case mode: stable per window, rotating across windows.
         self._worst_sequence_index: Dict[str, int] = {}
         self._worst_sequence_bucket: Dict[str, int] = {}
+        # csv path -> per-building frames for the file version it was built from
+        self._building_cache: Dict[str, Dict[str, Any]] = {}
 
     def load_tanks(self) -> pd.DataFrame:
         if not os.path.exists(self.tanks_csv_path):
             raise FileNotFoundError(f"Tank CSV not found at: {self.tanks_csv_path}")
 
-        df = pd.read_csv(self.tanks_csv_path)
-
-        if "timestamp" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-        else:
-            raise ValueError("water_tanks.csv must have 'timestamp' column")
-
-        return df
+        return _read_timestamped_csv(self.tanks_csv_path, "water_tanks.csv")
 
     def load_pumps(self) -> pd.DataFrame:
         if not os.path.exists(self.pumps_csv_path):
             raise FileNotFoundError(f"Pump CSV not found at: {self.pumps_csv_path}")
 
-        df = pd.read_csv(self.pumps_csv_path)
-
-        if "timestamp" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-        else:
-            raise ValueError("water_pumps.csv must have 'timestamp' column")
+        df = _read_timestamped_csv(self.pumps_csv_path, "water_pumps.csv")
 
         required_cols = {
             "pump_id",
@@ -71,10 +87,66 @@ class AssetService:
 
         return df
 
+    def _rows_by_building(self, csv_path: str, loader) -> Dict[str, Any]:
+        """
+        {"groups": building_id -> rows, "latest_first" / "oldest_first": building_id -> rows by time},
+        rebuilt only when the CSV's mtime changes. Frames are shared: copy before mutating.
+        """
+        mtime = os.stat(csv_path).st_mtime if os.path.exists(csv_path) else None
+        entry = self._building_cache.get(csv_path)
+        if entry is not None and entry["mtime"] == mtime:
+            return entry
+
+        df = loader()
+        if "building_id" not in df.columns:
+            raise ValueError(f"{os.path.basename(csv_path)} must have 'building_id' column")
+
+        entry = {
+            "mtime": mtime,
+            "groups": dict(tuple(df.groupby("building_id", sort=False))),
+            "latest_first": {},
+            "oldest_first": {},
+        }
+        self._building_cache[csv_path] = entry
+        return entry
+
+    @staticmethod
+    def _latest_first(entry: Dict[str, Any], building_id: str) -> pd.DataFrame:
+        ranked = entry["latest_first"].get(building_id)
+        if ranked is None:
+            sub = entry["groups"][building_id]
+            ranked = sub.sort_values("timestamp", ascending=False).reset_index(drop=True)
+            entry["latest_first"][building_id] = ranked
+        return ranked
+
+    @staticmethod
+    def _nearest_row(entry: Dict[str, Any], building_id: str, at_time: str) -> Dict[str, Any]:
+        """
+        Row whose timestamp is closest to `at_time`, found by binary search on the
+        building's rows in time order. Ties go to the earliest row in file order.
+        """
+        ranked = entry["oldest_first"].get(building_id)
+        if ranked is None:
+            sub = entry["groups"][building_id]
+            ranked = sub.sort_values("timestamp", kind="stable").reset_index(drop=True)
+            entry["oldest_first"][building_id] = ranked
+
+        ts = ranked["timestamp"].to_numpy()
+        t = _parse_at_time(at_time)
+        i = int(np.searchsorted(ts, t))
+        if i == len(ts) or (i > 0 and t - ts[i - 1] <= ts[i] - t):
+            # Earlier neighbour wins; step back to the first row with that timestamp
+            i = int(np.searchsorted(ts, ts[i - 1]))
+        return ranked.iloc[i].to_dict()
+
     def list_tanks(self) -> List[Dict[str, Any]]:
-        df = self.load_tanks().copy()
-        df["timestamp"] = df["timestamp"].astype(str)
-        return df.to_dict(orient="records")
+        # load_tanks() returns a fresh frame, so no defensive copy is needed
+        df = self.load_tanks()
+        columns = {col: df[col].tolist() for col in df.columns}
+        # Same text as astype(str) for whole-second timestamps, in one C-level pass
+        columns["timestamp"] = df["timestamp"].dt.strftime(TIMESTAMP_FORMAT).tolist()
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
 
     def _derive_level_state(self, level_pct: float) -> str:
         if level_pct <= CONFIG["tank_critical"]:
@@ -190,21 +262,17 @@ class AssetService:
         mode: str = "latest",  # latest | worst | at_time
         at_time: Optional[str] = None,
     ) -> Dict[str, Any]:
-        df = self.load_tanks()
+        entry = self._rows_by_building(self.tanks_csv_path, self.load_tanks)
+        sub = entry["groups"].get(building_id)
 
-        if "building_id" not in df.columns:
-            raise ValueError("water_tanks.csv must have 'building_id' column")
-
-        sub = df[df["building_id"] == building_id].copy()
-
-        if sub.empty:
+        if sub is None or sub.empty:
             return {"status": "not_found", "building_id": building_id}
 
         if mode == "latest":
             # Moving-but-consistent latest mode:
             # - within the same 20s bucket, all tabs see same row
             # - across buckets, we advance through real CSV history
-            sub = sub.sort_values("timestamp", ascending=False).reset_index(drop=True)
+            sub = self._latest_first(entry, building_id)
             building_key = f"{building_id}_latest"
             bucket = int(time.time() // 20)
             prev_bucket = self._latest_sequence_bucket.get(building_key)
@@ -247,11 +315,7 @@ class AssetService:
                     "message": "mode='at_time' requires at_time param (ISO datetime string)",
                 }
 
-            t = pd.to_datetime(at_time)
-            sub["time_diff"] = (sub["timestamp"] - t).abs()
-            sub = sub.sort_values("time_diff")
-            chosen = sub.iloc[0].to_dict()
-            chosen.pop("time_diff", None)
+            chosen = self._nearest_row(entry, building_id, at_time)
 
             return self._format_tank_status(building_id, chosen)
 
@@ -266,15 +330,13 @@ class AssetService:
         mode: str = "latest",  # latest | worst | at_time
         at_time: Optional[str] = None,
     ) -> Dict[str, Any]:
-        df = self.load_pumps()
-
-        sub = df[df["building_id"] == building_id].copy()
-        if sub.empty:
+        entry = self._rows_by_building(self.pumps_csv_path, self.load_pumps)
+        sub = entry["groups"].get(building_id)
+        if sub is None or sub.empty:
             return {"status": "not_found", "building_id": building_id, "asset": "pump"}
 
         if mode == "latest":
-            sub = sub.sort_values("timestamp", ascending=False)
-            chosen = sub.iloc[0].to_dict()
+            chosen = self._latest_first(entry, building_id).iloc[0].to_dict()
             return self._format_pump_status(building_id, chosen)
 
         if mode == "worst":
@@ -297,10 +359,7 @@ class AssetService:
                     "status": "error",
                     "message": "mode='at_time' requires at_time param (ISO datetime string)",
                 }
-            t = pd.to_datetime(at_time)
-            sub["time_diff"] = (sub["timestamp"] - t).abs()
-            sub = sub.sort_values("time_diff")
-            chosen = sub.iloc[0].to_dict()
+            chosen = self._nearest_row(entry, building_id, at_time)
             return self._format_pump_status(building_id, chosen)
 
         return {
@@ -1,17 +1,19 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from datetime import datetime
-import uuid
+from types import SimpleNamespace
+import secrets
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import Row, select
 
 from db.models import TaskDB
+from db.crud import create_tasks_bulk, find_open_duplicate
 
 
 def _make_id(prefix: str) -> str:
-    return f"{prefix}_{uuid.uuid4().hex[:8].upper()}"
+    return f"{prefix}_{secrets.token_hex(4).upper()}"
 
 
 class DBTaskService:
@@ -30,8 +32,20 @@ class DBTaskService:
         status: Optional[str] = None,
         limit: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
+        return [self._to_dict(t) for t in self.iter_tasks(building_id, status, limit)]
 
-        stmt = select(TaskDB)
+    def iter_tasks(
+        self,
+        building_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Row]:
+        """
+        Same selection and order as list_tasks, streamed as column Rows
+        (attribute access like TaskDB) without building per-task dicts.
+        """
+        # Plain column rows: no ORM identity map / instance hydration.
+        stmt = select(*TaskDB.__table__.columns)
 
         if building_id:
             stmt = stmt.where(TaskDB.building_id == building_id)
@@ -44,9 +58,7 @@ class DBTaskService:
         if limit:
             stmt = stmt.limit(limit)
 
-        rows = self.db.execute(stmt).scalars().all()
-
-        return [self._to_dict(t) for t in rows]
+        return iter(self.db.execute(stmt.execution_options(yield_per=200)))
 
     def create_task(
         self,
@@ -60,15 +72,11 @@ class DBTaskService:
     ) -> Dict[str, Any]:
 
         # ✅ DUPLICATE PREVENTION (same logic as memory version)
-        existing = (
-            self.db.query(TaskDB)
-            .filter(
-                TaskDB.status == "OPEN",
-                TaskDB.title.ilike(title),
-                TaskDB.asset_id == asset_id,
-                TaskDB.building_id == building_id,
-            )
-            .first()
+        existing = find_open_duplicate(
+            self.db,
+            title=title,
+            asset_id=asset_id,
+            building_id=building_id,
         )
 
         if existing:
@@ -97,8 +105,16 @@ class DBTaskService:
 
         return self._to_dict(task)
 
+    def create_tasks(self, task_dicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create several tasks in one transaction (duplicates resolved as in create_task).
+        """
+        rows = create_tasks_bulk(self.db, task_dicts)
+        return [self._to_dict(SimpleNamespace(**r)) for r in rows]
+
     # 🔁 INTERNAL
-    def _to_dict(self, t: TaskDB) -> Dict[str, Any]:
+    def _to_dict(self, t: Any) -> Dict[str, Any]:
+        # Accepts TaskDB instances and column Rows alike (attribute access).
         return {
             "task_id": t.task_id,
             "title": t.title,
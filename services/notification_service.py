@@ -1,17 +1,19 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+from collections import defaultdict
+from dataclasses import dataclass, asdict, field
 from datetime import datetime, timezone
 from typing import List, Dict, Optional, Any
-import uuid
+import heapq
+import secrets
 
 
-def _utc_now() -> str:
-    return datetime.now(timezone.utc).isoformat()
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
 
 
 def _make_id() -> str:
-    return f"NOTIF_{uuid.uuid4().hex[:8].upper()}"
+    return f"NOTIF_{secrets.token_hex(4).upper()}"
 
 push_sent: bool = False
 
@@ -30,14 +32,29 @@ class Notification:
     related_task_id: Optional[str]
     created_at: str
     read: bool = False
+    # Epoch seconds of created_at, for sorting and the dedupe window (not returned)
+    created_at_ts: float = field(default=0.0, repr=False)
+
+
+def _created_at(n: Notification) -> float:
+    return n.created_at_ts
+
+
+def _to_dict(n: Notification) -> Dict:
+    d = asdict(n)
+    del d["created_at_ts"]
+    return d
 
 
 class NotificationService:
     """
     In-memory notification store (POC).
+    Indexed by id and by building so reads/updates don't scan every notification.
     """
     def __init__(self):
         self._notifications: List[Notification] = []
+        self._by_id: Dict[str, Notification] = {}
+        self._by_building: Dict[str, List[Notification]] = defaultdict(list)
 
     def create_notification(
         self,
@@ -55,27 +72,19 @@ class NotificationService:
     ) -> Dict:
         # De-duplication to avoid flooding from frequent polling across tabs.
         # Look back through recent entries for the same logical notification.
-        now_iso = _utc_now()
-        try:
-            now = datetime.fromisoformat(now_iso)
-        except Exception:
-            now = None
+        now = _utc_now()
+        now_ts = now.timestamp()
 
-        for existing in reversed(self._notifications):
+        # Only the same building can match, so search its notifications alone
+        for existing in reversed(self._by_building.get(building_id, ())):
             if (
                 existing.type == type
                 and existing.severity == severity
                 and existing.building_id == building_id
                 and existing.message == message
             ):
-                if now is None:
-                    return asdict(existing)
-                try:
-                    prev = datetime.fromisoformat(existing.created_at)
-                    if abs((now - prev).total_seconds()) < 120:
-                        return asdict(existing)
-                except Exception:
-                    return asdict(existing)
+                if abs(now_ts - existing.created_at_ts) < 120:
+                    return _to_dict(existing)
                 # Older match found outside dedupe window; stop searching.
                 break
 
@@ -91,11 +100,14 @@ class NotificationService:
             action=action,
             building_id=building_id,
             related_task_id=related_task_id,
-            created_at=now_iso,
+            created_at=now.isoformat(),
             read=False,
+            created_at_ts=now_ts,
         )
         self._notifications.append(notif)
-        return asdict(notif)
+        self._by_id[notif.notification_id] = notif
+        self._by_building[building_id].append(notif)
+        return _to_dict(notif)
 
     def list_notifications(
         self,
@@ -103,23 +115,23 @@ class NotificationService:
         unread_only: bool = False,
         limit: Optional[int] = None,
     ) -> List[Dict]:
-        notifs = self._notifications
-
         if building_id:
-            notifs = [n for n in notifs if n.building_id == building_id]
+            notifs = self._by_building.get(building_id, [])
+        else:
+            notifs = self._notifications
 
         if unread_only:
             notifs = [n for n in notifs if not n.read]
 
-        notifs = sorted(notifs, key=lambda n: n.created_at, reverse=True)
-
+        # nlargest == sorted(..., reverse=True)[:limit], without sorting everything
         if limit:
-            notifs = notifs[:limit]
+            notifs = heapq.nlargest(limit, notifs, key=_created_at)
+        else:
+            notifs = sorted(notifs, key=_created_at, reverse=True)
 
-        return [asdict(n) for n in notifs]
+        return [_to_dict(n) for n in notifs]
 
     def mark_as_read(self, notification_id: str) -> None:
-        for n in self._notifications:
-            if n.notification_id == notification_id:
-                n.read = True
-                break
+        n = self._by_id.get(notification_id)
+        if n is not None:
+            n.read = True
@@ -1,9 +1,17 @@
 ﻿from __future__ import annotations
 
-from dataclasses import asdict, dataclass
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
-import uuid
+from dataclasses import dataclass, field
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from itertools import groupby, islice
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import secrets
+import sys
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
 
 
 def _utc_now() -> datetime:
@@ -11,10 +19,15 @@ def _utc_now() -> datetime:
 
 
 def _make_id(prefix: str) -> str:
-    return f"{prefix}_{uuid.uuid4().hex[:8].upper()}"
+    return f"{prefix}_{secrets.token_hex(4).upper()}"
+
 
+def _intern(value):
+    """sys.intern() for str labels; None (optional fields) passes through."""
+    return sys.intern(value) if isinstance(value, str) else value
 
-@dataclass
+
+@dataclass(slots=True)
 class Task:
     task_id: str
     title: str
@@ -28,6 +41,36 @@ class Task:
     created_at: str
     updated_at: str
     notes: Optional[str] = None
+    # created_at as integer epoch microseconds, for ordering (not returned)
+    created_at_us: int = field(default=0, repr=False)
+
+
+def _to_dict(t: Task) -> Dict[str, Any]:
+    # All fields are flat scalars, so a literal dict matches asdict() without
+    # its recursive deepcopy (or a per-field getattr loop)
+    return {
+        "task_id": t.task_id,
+        "title": t.title,
+        "description": t.description,
+        "asset_type": t.asset_type,
+        "asset_id": t.asset_id,
+        "building_id": t.building_id,
+        "priority": t.priority,
+        "sla_hours": t.sla_hours,
+        "status": t.status,
+        "created_at": t.created_at,
+        "updated_at": t.updated_at,
+        "notes": t.notes,
+    }
+
+
+def _newest_first(tasks_reversed: Iterable[Task]) -> Iterator[Task]:
+    """
+    Tasks walked newest-first from a creation-ordered list, ordered exactly as
+    sorted(..., key=created_at, reverse=True): equal timestamps keep creation order.
+    """
+    for _, same_time in groupby(tasks_reversed, key=attrgetter("created_at_us")):
+        yield from reversed(list(same_time))
 
 
 class TaskService:
@@ -37,6 +80,10 @@ class TaskService:
 
     def __init__(self):
         self._tasks: List[Task] = []
+        # (building_id, asset_id, lower-cased title) -> first OPEN task with that key
+        self._open_index: Dict[Tuple[str, str, str], Task] = {}
+        # building_id -> its tasks in creation order
+        self._by_building: Dict[str, List[Task]] = defaultdict(list)
 
     def list_tasks(
         self,
@@ -47,33 +94,48 @@ class TaskService:
         """
         List tasks with optional filters (history support).
         """
-        tasks = self._tasks
+        return [_to_dict(t) for t in self.iter_tasks(building_id, status, limit)]
 
+    def iter_tasks(
+        self,
+        building_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Task]:
+        """
+        Same selection and order as list_tasks, yielding the stored Task objects
+        lazily (no per-task dict); callers must not modify them.
+        """
+        # Lists are in creation order, so walking them backwards is newest first
+        # and a limit stops the walk early; no full sort
         if building_id:
-            tasks = [t for t in tasks if t.building_id == building_id]
+            tasks = reversed(self._by_building.get(building_id, ()))
+        else:
+            tasks = reversed(self._tasks)
 
         if status:
-            tasks = [t for t in tasks if t.status == status]
+            status = sys.intern(status)
+            tasks = (t for t in tasks if t.status == status)
 
-        tasks = sorted(tasks, key=lambda t: t.created_at, reverse=True)
+        tasks = _newest_first(tasks)
 
         if limit:
-            tasks = tasks[:limit]
+            tasks = islice(tasks, limit)
 
-        return [asdict(t) for t in tasks]
+        return tasks
 
     def _find_open_duplicate(
         self, title: str, asset_id: str, building_id: str
     ) -> Optional[Task]:
-        for t in self._tasks:
-            if (
-                t.status == "OPEN"
-                and t.title.lower() == title.lower()
-                and t.asset_id == asset_id
-                and t.building_id == building_id
-            ):
-                return t
-        return None
+        return self._open_duplicate((building_id, asset_id, title.lower()))
+
+    def _open_duplicate(self, key: Tuple[str, str, str]) -> Optional[Task]:
+        t = self._open_index.get(key)
+        if t is not None and t.status != "OPEN":
+            # Status changed since it was indexed; it no longer blocks duplicates
+            del self._open_index[key]
+            return None
+        return t
 
     def create_task(
         self,
@@ -86,11 +148,19 @@ class TaskService:
         sla_hours: int = 24,
     ) -> Dict[str, Any]:
 
-        dup = self._find_open_duplicate(title, asset_id, building_id)
+        # Title lower-cased once; the same key serves the lookup and the insert
+        # Low-cardinality labels interned: one shared str per value, and the
+        # filter/index compares hit CPython's identity fast path
+        building_id, asset_id = _intern(building_id), _intern(asset_id)
+        asset_type, priority = _intern(asset_type), _intern(priority)
+
+        key = (building_id, asset_id, title.lower())
+        dup = self._open_duplicate(key)
         if dup:
-            return asdict(dup)
+            return _to_dict(dup)
 
-        now = _utc_now().isoformat()
+        created = _utc_now()
+        now = created.isoformat()
 
         task = Task(
             task_id=_make_id("TASK"),
@@ -105,7 +175,53 @@ class TaskService:
             created_at=now,
             updated_at=now,
             notes=None,
+            created_at_us=(created - _EPOCH) // _MICROSECOND,
         )
 
         self._tasks.append(task)
-        return asdict(task)
+        self._open_index[key] = task
+        self._by_building[building_id].append(task)
+        return _to_dict(task)
+
+    def create_tasks(self, task_dicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create several tasks in one pass (same duplicate rules as create_task).
+
+        The batch shares one creation timestamp and one random read for its ids;
+        duplicates, including repeats within the batch, return the existing task.
+        """
+        created = _utc_now()
+        now = created.isoformat()
+        created_us = (created - _EPOCH) // _MICROSECOND
+        id_hex = secrets.token_hex(4 * len(task_dicts)).upper()
+
+        new_tasks: List[Task] = []
+        out: List[Dict[str, Any]] = []
+        for i, d in enumerate(task_dicts):
+            # Interned as in create_task
+            building_id, asset_id = _intern(d["building_id"]), _intern(d["asset_id"])
+            key = (building_id, asset_id, d["title"].lower())
+            task = self._open_duplicate(key)
+            if task is None:
+                task = Task(
+                    task_id=f"TASK_{id_hex[8 * i:8 * i + 8]}",
+                    title=d["title"],
+                    description=d["description"],
+                    asset_type=_intern(d["asset_type"]),
+                    asset_id=asset_id,
+                    building_id=building_id,
+                    priority=_intern(d.get("priority", "MEDIUM")),
+                    sla_hours=d.get("sla_hours", 24),
+                    status="OPEN",
+                    created_at=now,
+                    updated_at=now,
+                    notes=None,
+                    created_at_us=created_us,
+                )
+                self._open_index[key] = task
+                self._by_building[task.building_id].append(task)
+                new_tasks.append(task)
+            out.append(_to_dict(task))
+
+        self._tasks.extend(new_tasks)
+        return out
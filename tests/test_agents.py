@@ -1,9 +1,5 @@
 ﻿import pytest
 from pathlib import Path
-import sys
-
-# Add project root to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 def test_orchestrator_file_exists():
     """Test that orchestrator file exists"""
@@ -40,3 +36,33 @@ def test_maintenance_agent_imports():
         assert agents.maintenance_agent is not None
     except ImportError as e:
         pytest.fail(f"Failed to import maintenance agent: {e}")
+
+def test_decision_cache_roundtrip(tmp_path, monkeypatch):
+    """Test decision cache stores and expires decisions"""
+    from agents import decision_cache
+    monkeypatch.setattr(decision_cache, "DECISION_CACHE_DB_PATH", str(tmp_path / "decisions.db"))
+    key = decision_cache.decision_key("BLD_001", 30, 85, "2025-01-01 08:00")
+    assert decision_cache.get_decision(key) is None
+    decision_cache.put_decision(key, {"action_required": True, "priority": "HIGH"})
+    assert decision_cache.get_decision(key) == {"action_required": True, "priority": "HIGH"}
+    monkeypatch.setattr(decision_cache, "DECISION_CACHE_TTL_SECONDS", 0)
+    assert decision_cache.get_decision(key) is None
+
+@pytest.mark.parametrize("predicted, priority", [
+    (95, "CRITICAL"), (120, "CRITICAL"),
+    (88.1, "HIGH"), (94.9, "HIGH"),
+    (69.9, "LOW"), (0, "LOW"),
+])
+def test_rule_decide_bands(predicted, priority):
+    """Unambiguous predicted-demand bands are decided without the LLM"""
+    from agents.forecast_agent import _rule_decide
+    decision = _rule_decide(50, predicted)
+    assert decision["priority"] == priority
+    assert decision["action_required"] is (priority != "LOW")
+    assert decision["reasoning"].strip()
+
+@pytest.mark.parametrize("predicted", [70, 77, 84.9, 85, 86, 88])
+def test_rule_decide_defers_to_llm(predicted):
+    """70-84% and the 82-88% uncertainty band fall through to the LLM"""
+    from agents.forecast_agent import _rule_decide
+    assert _rule_decide(50, predicted) is None
@@ -1,9 +1,5 @@
 ﻿import pytest
 from pathlib import Path
-import sys
-
-# Add project root to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 def test_api_file_exists():
     """Test that main API file exists"""
@@ -49,3 +45,72 @@ def test_agents_directory_exists():
 def test_models_directory_exists():
     """Test that models directory exists"""
     assert Path("models").exists(), "models directory not found"
+
+@pytest.fixture
+def cors_request():
+    """
+    Request helper for a minimal app behind OpenCORSMiddleware (no startup
+    hooks). Uses httpx's ASGI transport directly: Starlette 0.32's TestClient
+    doesn't accept the httpx >= 0.28 Client signature.
+    """
+    import asyncio
+    import httpx
+    from fastapi import FastAPI
+    from api.cors import OpenCORSMiddleware
+
+    app = FastAPI()
+    app.add_middleware(OpenCORSMiddleware)
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @app.get("/items")
+    def items():
+        return ["a"]
+
+    async def send(method, url, headers):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return await client.request(method, url, headers=headers)
+
+    def request(method, url, headers=None):
+        return asyncio.run(send(method, url, headers))
+
+    return request
+
+def test_cors_preflight(cors_request):
+    """Preflight answers 204 with the origin and requested headers echoed"""
+    response = cors_request("OPTIONS", "/items", headers={
+        "Origin": "https://ui.example",
+        "Access-Control-Request-Method": "POST",
+        "Access-Control-Request-Headers": "content-type, x-api-key",
+    })
+    assert response.status_code == 204
+    assert response.content == b""
+    assert response.headers["access-control-allow-origin"] == "https://ui.example"
+    assert response.headers["access-control-allow-headers"] == "content-type, x-api-key"
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert "POST" in response.headers["access-control-allow-methods"]
+    assert response.headers["vary"] == "Origin"
+
+def test_cors_simple_request(cors_request):
+    """Cross-origin GET reaches the route and carries the CORS headers"""
+    response = cors_request("GET", "/items", headers={"Origin": "https://ui.example"})
+    assert response.status_code == 200
+    assert response.json() == ["a"]
+    assert response.headers["access-control-allow-origin"] == "https://ui.example"
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert "access-control-allow-methods" not in response.headers
+
+def test_cors_without_origin(cors_request):
+    """Same-origin requests pass through untouched"""
+    response = cors_request("GET", "/items")
+    assert response.status_code == 200
+    assert "access-control-allow-origin" not in response.headers
+
+def test_cors_skips_health(cors_request):
+    """/health bypasses the middleware, even cross-origin"""
+    response = cors_request("GET", "/health", headers={"Origin": "https://ui.example"})
+    assert response.status_code == 200
+    assert "access-control-allow-origin" not in response.headers
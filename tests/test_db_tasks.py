@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db import models  # noqa: F401  (registers TaskDB on Base)
+from db.session import Base
+from services.db_task_service import DBTaskService
+
+TASKS = [
+    {"title": "Pump vibration check", "description": "d1", "asset_type": "pump",
+     "asset_id": "PUMP_1", "building_id": "BLD_001", "priority": "HIGH", "sla_hours": 4},
+    # Case-only repeat of the first: a duplicate on both paths
+    {"title": "PUMP VIBRATION CHECK", "description": "d2", "asset_type": "pump",
+     "asset_id": "PUMP_1", "building_id": "BLD_001", "priority": "HIGH", "sla_hours": 4},
+    # Non-ASCII case difference: SQLite lower() leaves it distinct on both paths
+    {"title": "Überdruck prüfen", "description": "d3", "asset_type": "pump",
+     "asset_id": "PUMP_1", "building_id": "BLD_001", "priority": "LOW", "sla_hours": 24},
+    {"title": "überdruck prüfen", "description": "d4", "asset_type": "pump",
+     "asset_id": "PUMP_1", "building_id": "BLD_001", "priority": "LOW", "sla_hours": 24},
+    {"title": "Pump vibration check", "description": "d5", "asset_type": "pump",
+     "asset_id": "PUMP_2", "building_id": "BLD_001", "priority": "MEDIUM", "sla_hours": 24},
+]
+
+
+@pytest.fixture
+def make_service():
+    def make():
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        return DBTaskService(sessionmaker(bind=engine)())
+    return make
+
+
+def _shape(results):
+    """Results with ids replaced by first-seen index and timestamps by their format."""
+    ids = {}
+    shaped = []
+    for r in results:
+        r = dict(r)
+        r["task_id"] = ids.setdefault(r["task_id"], len(ids))
+        for field in ("created_at", "updated_at"):
+            r[field] = "+" in r[field] or r[field].endswith("Z")
+        shaped.append(r)
+    return shaped
+
+
+def test_create_tasks_matches_create_task(make_service):
+    """Bulk creation returns what one create_task call per input would"""
+    single = make_service()
+    one_by_one = [single.create_task(**t) for t in TASKS]
+    bulk = make_service().create_tasks(TASKS)
+
+    assert _shape(bulk) == _shape(one_by_one)
+    # Both paths return naive-UTC ISO timestamps, like list_tasks
+    assert not any(r["created_at"] for r in _shape(bulk))
+    # The case-only repeat folds into the first task; the non-ASCII pair stays apart
+    assert len({r["task_id"] for r in bulk}) == 4
@@ -18,36 +18,13 @@ def test_demand_forecast_models_exist():
     prophet_models = list(artifacts_dir.glob("prophet_*.pkl"))
     assert len(prophet_models) > 0, "No prophet models found"
 
-def test_maintenance_model_loads():
+def test_maintenance_model_loads(maintenance_model):
     """Test that maintenance model can be loaded"""
-    model_path = Path("models/predictive_maintenance/artifacts/model.pkl")
-    if not model_path.exists():
-        pytest.skip("Maintenance model not available")
-    
-    import pickle
-    with open(model_path, "rb") as f:
-        model = pickle.load(f)
-    assert model is not None
+    assert maintenance_model is not None
 
-def test_demand_forecast_model_loads():
+def test_demand_forecast_model_loads(demand_forecast_model):
     """Test that demand forecast models can be loaded"""
-    artifacts_dir = Path("models/demand_forecast/artifacts")
-    if not artifacts_dir.exists():
-        pytest.skip("Demand forecast models not available")
-    
-    prophet_models = list(artifacts_dir.glob("prophet_*.pkl"))
-    if len(prophet_models) == 0:
-        pytest.skip("No prophet models found")
-    
-    # Prophet models are saved with pickle, but may need special handling
-    try:
-        import pickle
-        with open(prophet_models[0], "rb") as f:
-            model = pickle.load(f)
-        assert model is not None
-    except Exception as e:
-        # If loading fails, just check the file exists
-        pytest.skip(f"Prophet model exists but couldn't be loaded (may need Prophet-specific loader): {e}")
+    assert demand_forecast_model is not None
 
 def test_training_data_exists():
     """Test that training data files exist"""
@@ -92,3 +69,129 @@ def test_demand_forecast_artifacts():
     
     assert artifacts_dir.exists()
     assert (artifacts_dir / "metadata.json").exists()
+
+def test_demand_model_io_round_trip(tmp_path):
+    """dump_model/load_model round-trip; a re-dump leaves earlier loads readable"""
+    import numpy as np
+    from models.demand_forecast.model_io import dump_model, load_model
+
+    model_path = str(tmp_path / "prophet_test.pkl")
+    first = {"name": "v1", "params": np.arange(100_000, dtype=np.float64)}
+    dump_model(first, model_path)
+    loaded = load_model(model_path)
+    assert loaded["name"] == "v1"
+    assert np.array_equal(loaded["params"], first["params"])
+
+    second = {"name": "v2", "params": np.full(50_000, 7.0)}
+    dump_model(second, model_path)
+    # The earlier mapping must still be backed by its own (now unlinked) file
+    assert np.array_equal(loaded["params"], first["params"])
+
+    reloaded = load_model(model_path)
+    assert reloaded["name"] == "v2"
+    assert np.array_equal(reloaded["params"], second["params"])
+    # One buffer file per live version, no temp files left behind
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".npybuf", ".pkl"]
+
+
+PUMP_DATA = Path("data/samples/water_pumps.csv")
+
+
+@pytest.fixture(scope="module")
+def maintenance_artifacts(tmp_path_factory):
+    """Predictive maintenance model trained from the sample data into a temp dir."""
+    if not PUMP_DATA.exists():
+        pytest.skip("Training data not generated yet")
+    from models.predictive_maintenance.train import train_failure_risk_model
+
+    artifact_dir = tmp_path_factory.mktemp("pm_artifacts")
+    train_failure_risk_model(str(PUMP_DATA), str(artifact_dir))
+    return artifact_dir
+
+
+def test_pump_features_at_matches_add_pump_features():
+    """Single-row features from the column arrays equal the training DataFrame pass"""
+    import numpy as np
+    from models.predictive_maintenance import predict
+    from models.predictive_maintenance.features import add_pump_features, pump_features_at
+
+    if not PUMP_DATA.exists():
+        pytest.skip("Training data not generated yet")
+
+    mtime = PUMP_DATA.stat().st_mtime
+    expected = add_pump_features(predict._read_pump_data(str(PUMP_DATA), mtime).copy())
+    columns, slices = predict._read_pump_store(str(PUMP_DATA), mtime)
+
+    for start, end in slices.values():
+        pump_columns = {col: values[start:end] for col, values in columns.items()}
+        # First rows (short windows, no lag yet), the lag/window edges, and the last row
+        for pos in sorted({0, 1, 23, 24, 47, 48, end - start - 1}):
+            if pos >= end - start:
+                continue
+            features = pump_features_at(pump_columns, pos)
+            row = expected.iloc[start + pos]
+            for name, value in features.items():
+                assert np.isclose(value, row[name], rtol=1e-9, atol=1e-12, equal_nan=True), (name, start + pos)
+
+
+def _reference_risk_scores(artifact_dir, pump_ids, timestamp=None):
+    """
+    Scores from the straightforward path: add_pump_features over the CSV, the
+    pre-batching target-row choice, then scaler.transform + predict_proba.
+    """
+    import json
+    import pickle
+
+    import numpy as np
+    import pandas as pd
+    from models.predictive_maintenance.features import add_pump_features
+
+    with open(artifact_dir / "model.pkl", "rb") as f:
+        model = pickle.load(f)
+    with open(artifact_dir / "scaler.pkl", "rb") as f:
+        scaler = pickle.load(f)
+    with open(artifact_dir / "metadata.json") as f:
+        feature_cols = json.load(f)["features"]
+
+    df_pumps = pd.read_csv(PUMP_DATA, parse_dates=["timestamp"])
+    df_pumps = add_pump_features(df_pumps.sort_values(["pump_id", "timestamp"]))
+
+    scores = {}
+    for pump_id in pump_ids:
+        pump_data = df_pumps[df_pumps["pump_id"] == pump_id]
+        if timestamp is not None:
+            target = pd.to_datetime(timestamp)
+        elif (pump_data["status"] == "failed").any():
+            target = pump_data.loc[pump_data["status"] == "failed", "timestamp"].iloc[0] - pd.Timedelta(hours=48)
+        else:
+            target = pump_data["timestamp"].iloc[-1]
+        latest = pump_data.loc[(pump_data["timestamp"] - target).abs().idxmin()]
+        X = latest[feature_cols].to_numpy(dtype=np.float32).reshape(1, -1)
+        scores[pump_id] = (str(latest["timestamp"]), float(model.predict_proba(scaler.transform(X))[0][1]))
+    return scores
+
+
+def test_predict_failure_risk_batch_matches_reference(maintenance_artifacts, monkeypatch):
+    """Batched scoring returns the risk a plain feature-frame + sklearn pass gives"""
+    from models.predictive_maintenance import predict
+
+    monkeypatch.setattr(predict, "MODEL_PATH", str(maintenance_artifacts / "model.pkl"))
+    monkeypatch.setattr(predict, "SCALER_PATH", str(maintenance_artifacts / "scaler.pkl"))
+    monkeypatch.setattr(predict, "METADATA_PATH", str(maintenance_artifacts / "metadata.json"))
+    predict.clear_model_cache()
+    try:
+        _, slices = predict._read_pump_store(str(PUMP_DATA), PUMP_DATA.stat().st_mtime)
+        pump_ids = list(slices)
+
+        # Default target rows, a quiet period, and two hours with mid-range risk
+        for timestamp in (None, "2025-10-03 12:00:00", "2025-10-06 23:30:00", "2025-10-08 23:30:00"):
+            batch = predict.predict_failure_risk_batch(pump_ids + ["PUMP_MISSING"], timestamp=timestamp)
+            assert list(batch) == pump_ids + ["PUMP_MISSING"]
+            assert batch["PUMP_MISSING"]["risk_level"] == "UNKNOWN"
+
+            reference = _reference_risk_scores(maintenance_artifacts, pump_ids, timestamp)
+            for pump_id, (reading_time, risk) in reference.items():
+                assert batch[pump_id]["timestamp"] == reading_time, pump_id
+                assert batch[pump_id]["risk_score"] == round(risk, 3), pump_id
+    finally:
+        predict.clear_model_cache()